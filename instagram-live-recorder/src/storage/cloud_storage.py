@@ -8,19 +8,70 @@ Cloudflare R2는 S3 호환 API를 제공하므로 boto3를 사용합니다.
 """
 import os
 import threading
+from collections import defaultdict
 from pathlib import Path
-from typing import Optional, Dict, List, Callable
+from typing import Optional, Dict, List, Callable, Iterator, Tuple
+from itertools import islice
+from urllib.parse import quote
 from datetime import datetime
 from dataclasses import dataclass
 import boto3
 from boto3.s3.transfer import TransferConfig
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
+
+# botocore의 CRC32C 체크섬은 awscrt(하드웨어 CRC32 명령 사용)가 있어야 동작
+try:
+    import awscrt  # noqa: F401
+    _UPLOAD_CHECKSUM_ALGORITHM: Optional[str] = 'CRC32C'
+except ImportError:
+    _UPLOAD_CHECKSUM_ALGORITHM = None
+
 from src.utils.logger import get_logger
 from src.recorder.stream_recorder import RecordingTask
 
 logger = get_logger()
 
+# 확장자별 Content-Type
+_CONTENT_TYPES = {
+    '.mp4': 'video/mp4',
+    '.mkv': 'video/x-matroska',
+    '.webm': 'video/webm',
+    '.ts': 'video/mp2t',
+    '.m4a': 'audio/mp4',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png'
+}
+
+# 크기 단위 (1024배씩 증가)
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
+# URL 인코딩이 필요한 녹화 메타데이터 필드
+_RECORDING_METADATA_TEXT_KEYS = ('username', 'broadcast_id', 'display_name', 'title')
+
+
+def _safe_metadata(value: str, max_length: int = 200) -> str:
+    """
+    메타데이터 값을 안전하게 변환
+
+    R2/S3 메타데이터는 ASCII만 허용하므로 URL 인코딩 사용
+    """
+    if not value:
+        return ""
+    # ASCII가 아닌 문자를 URL 인코딩, 최대 길이 제한 (인코딩 후)
+    return quote(str(value)[:max_length], safe='')[:500]
+
+
+def _format_size(size_bytes: int) -> str:
+    """바이트를 읽기 쉬운 형식으로 변환 (bit_length로 단위를 한 번에 결정)"""
+    size_bytes = int(size_bytes)
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    exp = min((size_bytes.bit_length() - 1) // 10, 4)
+    return f"{size_bytes / (1 << (exp * 10)):.1f} {_UNITS[exp]}"
+
 
 @dataclass
 class UploadProgress:
@@ -120,10 +171,24 @@ class CloudStorage:
             use_threads=True
         )
         
+        # 목록 조회용 페이지네이터 (list_files / list_recordings / get_storage_usage 공용)
+        self._paginator = self.client.get_paginator('list_objects_v2')
+        
         # 업로드 콜백
         self._upload_callbacks: List[Callable] = []
         
-        self._verify_bucket()
+        # 버킷 확인은 첫 업로드 시점으로 지연 (읽기 전용 사용 시 HeadBucket 생략)
+        self._bucket_verified = False
+        self._bucket_lock = threading.Lock()
+    
+    def _ensure_bucket(self):
+        """첫 쓰기 작업 전에 버킷을 한 번만 확인"""
+        if self._bucket_verified:
+            return
+        with self._bucket_lock:
+            if not self._bucket_verified:
+                self._verify_bucket()
+                self._bucket_verified = True
     
     def _verify_bucket(self):
         """버킷 존재 확인"""
@@ -164,7 +229,8 @@ class CloudStorage:
         local_path: Path,
         remote_path: Optional[str] = None,
         metadata: Optional[Dict] = None,
-        content_type: Optional[str] = None
+        content_type: Optional[str] = None,
+        file_size: Optional[int] = None
     ) -> bool:
         """
         파일 업로드
@@ -174,53 +240,54 @@ class CloudStorage:
             remote_path: 원격 경로 (None이면 파일명 사용)
             metadata: 추가 메타데이터
             content_type: MIME 타입 (None이면 자동 감지)
+            file_size: 파일 크기 (이미 알고 있으면 stat 생략)
         
         Returns:
             성공 여부
         """
         local_path = Path(local_path)
         
-        if not local_path.exists():
-            logger.error(f"파일을 찾을 수 없음: {local_path}")
-            return False
+        # 파일 크기 (존재 확인 겸 stat 1회)
+        if file_size is None:
+            try:
+                file_size = os.stat(local_path).st_size
+            except FileNotFoundError:
+                logger.error(f"파일을 찾을 수 없음: {local_path}")
+                return False
         
         if remote_path is None:
             remote_path = local_path.name
         
-        # 파일 크기
-        file_size = local_path.stat().st_size
-        
         try:
-            extra_args = {}
+            self._ensure_bucket()
             
-            # 메타데이터 추가
-            if metadata:
-                extra_args['Metadata'] = {
-                    k: str(v)[:1024] for k, v in metadata.items()  # R2 메타데이터 크기 제한
-                }
+            extra_args: Optional[Dict] = None
             
-            # Content-Type 설정
-            if content_type:
-                extra_args['ContentType'] = content_type
-            else:
-                suffix = local_path.suffix.lower()
-                content_types = {
-                    '.mp4': 'video/mp4',
-                    '.mkv': 'video/x-matroska',
-                    '.webm': 'video/webm',
-                    '.ts': 'video/mp2t',
-                    '.m4a': 'audio/mp4',
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.png': 'image/png'
-                }
-                if suffix in content_types:
-                    extra_args['ContentType'] = content_types[suffix]
+            # Content-Type 설정 (None이면 확장자로 자동 감지)
+            if not content_type:
+                content_type = _CONTENT_TYPES.get(local_path.suffix.lower())
+            
+            # 추가할 항목이 있을 때만 dict 생성
+            if metadata or content_type or _UPLOAD_CHECKSUM_ALGORITHM:
+                extra_args = {}
+                
+                # 메타데이터 추가
+                if metadata:
+                    extra_args['Metadata'] = {
+                        k: str(v)[:1024] for k, v in metadata.items()  # R2 메타데이터 크기 제한
+                    }
+                
+                if content_type:
+                    extra_args['ContentType'] = content_type
+                
+                # 무결성 체크섬: 소프트웨어 MD5 대신 CRC32C
+                if _UPLOAD_CHECKSUM_ALGORITHM:
+                    extra_args['ChecksumAlgorithm'] = _UPLOAD_CHECKSUM_ALGORITHM
             
             # 업로드 시작
             logger.info(
                 f"☁️ R2 업로드 시작: {local_path.name} "
-                f"({self._format_size(file_size)}) -> {remote_path}"
+                f"({_format_size(file_size)}) -> {remote_path}"
             )
             
             # 진행률 콜백 설정
@@ -240,7 +307,7 @@ class CloudStorage:
                 str(local_path),
                 self.bucket_name,
                 remote_path,
-                ExtraArgs=extra_args if extra_args else None,
+                ExtraArgs=extra_args,
                 Config=self.transfer_config,
                 Callback=progress_callback
             )
@@ -272,9 +339,14 @@ class CloudStorage:
     
     def upload_recording(self, task: RecordingTask) -> bool:
         """녹화 파일 업로드"""
-        if not task.output_path.exists():
-            logger.warning(f"녹화 파일이 존재하지 않음: {task.output_path}")
-            return False
+        # 녹화 종료 시 기록된 크기를 재사용, 없으면 stat 1회
+        file_size = task.file_size or None
+        if file_size is None:
+            try:
+                file_size = os.stat(task.output_path).st_size
+            except FileNotFoundError:
+                logger.warning(f"녹화 파일이 존재하지 않음: {task.output_path}")
+                return False
         
         # 원격 경로: username/YYYY-MM/filename
         # 월별로 폴더 정리
@@ -282,33 +354,28 @@ class CloudStorage:
         remote_path = f"{task.broadcast.username}/{month_folder}/{task.output_path.name}"
         
         # 메타데이터 (S3 호환 - ASCII 안전하게 인코딩)
-        # R2/S3 메타데이터는 ASCII만 허용하므로 URL 인코딩 사용
-        import urllib.parse
-        
-        def safe_metadata(value: str, max_length: int = 200) -> str:
-            """메타데이터 값을 안전하게 변환"""
-            if not value:
-                return ""
-            # ASCII가 아닌 문자를 URL 인코딩
-            encoded = urllib.parse.quote(str(value)[:max_length], safe='')
-            # 최대 길이 제한 (인코딩 후)
-            return encoded[:500]
+        broadcast = task.broadcast
+        started_at, ended_at = task.started_at, task.ended_at
+        if started_at and ended_at:
+            duration = int((ended_at - started_at).total_seconds())
+        else:
+            duration = 0
         
-        metadata = {
-            'username': safe_metadata(task.broadcast.username),
-            'broadcast_id': safe_metadata(task.broadcast.broadcast_id),
-            'display_name': safe_metadata(task.broadcast.display_name),
-            'recorded_at': task.started_at.isoformat() if task.started_at else '',
-            'ended_at': task.ended_at.isoformat() if task.ended_at else '',
-            'duration_seconds': str(
-                int((task.ended_at - task.started_at).total_seconds())
-                if task.started_at and task.ended_at else 0
-            ),
-            'title': safe_metadata(task.broadcast.title),
-            'viewer_count': str(task.broadcast.viewer_count)
-        }
+        metadata = dict(zip(
+            _RECORDING_METADATA_TEXT_KEYS,
+            [_safe_metadata(broadcast.username),
+             _safe_metadata(broadcast.broadcast_id),
+             _safe_metadata(broadcast.display_name),
+             _safe_metadata(broadcast.title)]
+        ))
+        metadata['recorded_at'] = started_at.isoformat() if started_at else ''
+        metadata['ended_at'] = ended_at.isoformat() if ended_at else ''
+        metadata['duration_seconds'] = str(duration)
+        metadata['viewer_count'] = str(broadcast.viewer_count)
         
-        return self.upload_file(task.output_path, remote_path, metadata)
+        return self.upload_file(
+            task.output_path, remote_path, metadata, file_size=file_size
+        )
     
     def download_file(
         self,
@@ -349,6 +416,34 @@ class CloudStorage:
                 logger.error(f"다운로드 실패: {e}")
             return False
     
+    def _iter_objects(self, prefix: str = "") -> Iterator[Tuple[str, int, datetime, str]]:
+        """
+        객체 목록을 단일 LIST 패스로 스트리밍
+
+        Yields:
+            (key, size, last_modified, etag) 튜플
+        """
+        pages = self._paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+        for page in pages:
+            for obj in page.get('Contents', ()):
+                yield (
+                    obj['Key'],
+                    obj['Size'],
+                    obj['LastModified'],
+                    obj.get('ETag', '').strip('"')
+                )
+    
+    @staticmethod
+    def _object_to_dict(key: str, size: int, last_modified: datetime, etag: str) -> Dict:
+        """_iter_objects 튜플을 파일 정보 dict로 변환"""
+        return {
+            'key': key,
+            'size': size,
+            'size_formatted': _format_size(size),
+            'last_modified': last_modified,
+            'etag': etag
+        }
+    
     def list_files(
         self,
         prefix: str = "",
@@ -356,38 +451,10 @@ class CloudStorage:
     ) -> List[Dict]:
         """파일 목록 조회"""
         try:
-            files = []
-            continuation_token = None
-            
-            while True:
-                params = {
-                    'Bucket': self.bucket_name,
-                    'Prefix': prefix,
-                    'MaxKeys': min(max_keys - len(files), 1000)
-                }
-                
-                if continuation_token:
-                    params['ContinuationToken'] = continuation_token
-                
-                response = self.client.list_objects_v2(**params)
-                
-                for obj in response.get('Contents', []):
-                    files.append({
-                        'key': obj['Key'],
-                        'size': obj['Size'],
-                        'size_formatted': self._format_size(obj['Size']),
-                        'last_modified': obj['LastModified'],
-                        'etag': obj.get('ETag', '').strip('"')
-                    })
-                
-                # 페이지네이션
-                if response.get('IsTruncated') and len(files) < max_keys:
-                    continuation_token = response.get('NextContinuationToken')
-                else:
-                    break
-            
-            return files
-            
+            return [
+                self._object_to_dict(*obj)
+                for obj in islice(self._iter_objects(prefix), max_keys)
+            ]
         except ClientError as e:
             logger.error(f"파일 목록 조회 실패: {e}")
             return []
@@ -403,11 +470,18 @@ class CloudStorage:
             녹화 파일 정보 리스트
         """
         prefix = f"{username}/" if username else ""
-        files = self.list_files(prefix=prefix)
         
         # 비디오 파일만 필터링
         video_extensions = ('.mp4', '.mkv', '.webm', '.ts')
-        return [f for f in files if f['key'].lower().endswith(video_extensions)]
+        try:
+            return [
+                self._object_to_dict(*obj)
+                for obj in self._iter_objects(prefix)
+                if obj[0].lower().endswith(video_extensions)
+            ]
+        except ClientError as e:
+            logger.error(f"녹화 목록 조회 실패: {e}")
+            return []
     
     def get_file_info(self, remote_path: str) -> Optional[Dict]:
         """파일 정보 및 메타데이터 조회"""
@@ -420,7 +494,7 @@ class CloudStorage:
             return {
                 'key': remote_path,
                 'size': response['ContentLength'],
-                'size_formatted': self._format_size(response['ContentLength']),
+                'size_formatted': _format_size(response['ContentLength']),
                 'content_type': response.get('ContentType', ''),
                 'last_modified': response.get('LastModified'),
                 'metadata': response.get('Metadata', {}),
@@ -533,34 +607,34 @@ class CloudStorage:
     def get_storage_usage(self) -> Dict:
         """저장소 사용량 조회"""
         try:
-            files = self.list_files(max_keys=10000)
-            total_size = sum(f['size'] for f in files)
+            # 전체 객체를 한 번의 LIST 패스로 집계 (개수 제한 없음)
+            file_count = 0
+            total_size = 0
             
-            # 유저별 통계
-            user_stats = {}
-            for f in files:
-                parts = f['key'].split('/')
-                if len(parts) > 0:
-                    username = parts[0]
-                    if username not in user_stats:
-                        user_stats[username] = {'count': 0, 'size': 0}
-                    user_stats[username]['count'] += 1
-                    user_stats[username]['size'] += f['size']
+            # 유저별 통계: username -> [count, size]
+            user_stats = defaultdict(lambda: [0, 0])
+            for key, size, _, _ in self._iter_objects():
+                file_count += 1
+                total_size += size
+                username, _, _ = key.partition('/')
+                stats = user_stats[username]
+                stats[0] += 1
+                stats[1] += size
             
             # 월별 비용 추정 ($0.015/GB)
             monthly_cost = (total_size / (1024 ** 3)) * 0.015
             
             return {
-                'file_count': len(files),
+                'file_count': file_count,
                 'total_size_bytes': total_size,
-                'total_size_formatted': self._format_size(total_size),
+                'total_size_formatted': _format_size(total_size),
                 'estimated_monthly_cost': f"${monthly_cost:.2f}",
                 'user_stats': {
                     k: {
-                        'count': v['count'],
-                        'size_formatted': self._format_size(v['size'])
+                        'count': count,
+                        'size_formatted': _format_size(size)
                     }
-                    for k, v in user_stats.items()
+                    for k, (count, size) in user_stats.items()
                 }
             }
         except Exception as e:
@@ -574,22 +648,17 @@ class CloudStorage:
             }
     
     def test_connection(self) -> bool:
-        """연결 테스트"""
+        """연결 테스트 (버킷이 없으면 생성, 확인 결과는 이후 업로드에서 재사용)"""
         try:
-            self.client.head_bucket(Bucket=self.bucket_name)
+            self._ensure_bucket()
             logger.info("R2 연결 테스트 성공")
             return True
         except Exception as e:
             logger.error(f"R2 연결 테스트 실패: {e}")
             return False
     
-    def _format_size(self, size_bytes: int) -> str:
-        """바이트를 읽기 쉬운 형식으로 변환"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.1f} TB"
+    # r2_manager 등 외부에서 storage._format_size 형태로 사용
+    _format_size = staticmethod(_format_size)
 
 
 def create_cloud_storage(config) -> Optional[CloudStorage]:
@@ -622,11 +691,7 @@ def create_cloud_storage(config) -> Optional[CloudStorage]:
             public_url=getattr(config, 'r2_public_url', '')
         )
         
-        # 연결 테스트
-        if not storage.test_connection():
-            logger.warning("R2 연결 실패. 설정을 확인하세요.")
-            return None
-        
+        # 버킷 확인/생성은 첫 업로드 시 _ensure_bucket에서 수행
         return storage
         
     except Exception as e:
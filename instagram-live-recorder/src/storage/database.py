@@ -5,8 +5,12 @@ SQLite 데이터베이스 - 녹화 이력 및 통계 저장
 - recordings: 녹화 이력
 - daily_stats: 일일 통계
 - live_detections: 라이브 감지 이력
+- totals / seen_users: 전체 누적 통계 (recordings 트리거로 유지)
 """
+import atexit
+import queue
 import sqlite3
+import sys
 import threading
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -17,8 +21,80 @@ from src.utils.logger import get_logger
 
 logger = get_logger()
 
+# Python 3.10+에서는 레코드 dataclass에 __slots__ 사용 (메모리/속성 접근 속도)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+def _convert_timestamp(value: bytes) -> Optional[datetime]:
+    """TIMESTAMP 컬럼 -> datetime (잘못된 값은 None)"""
+    try:
+        return datetime.fromisoformat(value.decode())
+    except ValueError:
+        return None
+
+
+# datetime 저장/복원을 sqlite3 C 레이어에서 처리 (PARSE_DECLTYPES로 연결)
+# 저장 형식은 기존 데이터와 문자열 비교가 맞도록 공백 구분자 ISO 형식 유지
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('TIMESTAMP', _convert_timestamp)
+sqlite3.register_converter('BOOLEAN', lambda value: value not in (b'0', b''))
+
+# RecordingRecord 필드 순서와 동일한 컬럼 목록 (SELECT * 대신 사용)
+_RECORDING_COLUMNS = (
+    'id, broadcast_id, username, display_name, title, started_at, ended_at, '
+    'duration_seconds, file_path, file_size, status, '
+    "COALESCE(error_message, '') AS error_message, "
+    "cloud_uploaded, COALESCE(cloud_url, '') AS cloud_url, retry_count, created_at"
+)
+
+# DailyStats 필드 순서와 동일한 컬럼 목록
+_DAILY_STATS_COLUMNS = (
+    'date, total_checks, lives_detected, recordings_completed, '
+    'recordings_failed, total_duration_seconds, total_size_bytes'
+)
+
+# 자주 실행되는 SQL은 모듈 상수로 두어 매 호출 동일한 문자열 객체로 statement cache 적중
+_INSERT_RECORDING_SQL = '''
+    INSERT INTO recordings (
+        broadcast_id, username, display_name, title,
+        started_at, ended_at, duration_seconds,
+        file_path, file_size, status, error_message,
+        cloud_uploaded, cloud_url, retry_count
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SELECT_RECORDING_SQL = f'SELECT {_RECORDING_COLUMNS} FROM recordings WHERE id = ?'
+
+_INSERT_LIVE_DETECTION_SQL = '''
+    INSERT INTO live_detections (
+        broadcast_id, username, display_name, title, viewer_count
+    ) VALUES (?, ?, ?, ?, ?)
+'''
+
+_MARK_LIVE_RECORDED_SQL = '''
+    UPDATE live_detections
+    SET recorded = TRUE
+    WHERE broadcast_id = ? AND recorded = 0
+'''
+
+_UPSERT_DAILY_STATS_SQL = '''
+    INSERT INTO daily_stats (
+        date, total_checks, lives_detected,
+        recordings_completed, recordings_failed,
+        total_duration_seconds, total_size_bytes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date) DO UPDATE SET
+        total_checks = total_checks + excluded.total_checks,
+        lives_detected = lives_detected + excluded.lives_detected,
+        recordings_completed = recordings_completed + excluded.recordings_completed,
+        recordings_failed = recordings_failed + excluded.recordings_failed,
+        total_duration_seconds = total_duration_seconds + excluded.total_duration_seconds,
+        total_size_bytes = total_size_bytes + excluded.total_size_bytes,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class RecordingRecord:
     """녹화 기록"""
     id: Optional[int] = None
@@ -54,35 +130,125 @@ class DailyStats:
 class Database:
     """SQLite 데이터베이스 관리"""
 
+    # journal_mode=WAL은 DB 파일에 영구 저장되므로 파일별 첫 연결에서 한 번만 설정
+    # (page_size를 바꿔야 한다면 DELETE 모드로 전환 -> page_size 설정 -> VACUUM -> WAL 재설정)
+    _wal_initialized: set = set()
+    _wal_lock = threading.Lock()
+
+    # 백그라운드 writer가 대기 중인 쓰기를 묶어 커밋하는 주기 (초)
+    WRITE_BATCH_INTERVAL = 0.1
+
+    # 연결별 prepared statement 캐시 크기 (기본 128, 자주 쓰는 쿼리가 밀려나지 않도록 명시)
+    STATEMENT_CACHE_SIZE = 128
+
+    # 이 행 수만큼 일괄 쓰기가 누적되면 writer 스레드에서 ANALYZE 실행
+    ANALYZE_ROW_THRESHOLD = 1000
+
+    # 읽기 전용 연결 풀 크기 (쓰기는 전용 연결 1개를 락으로 직렬화)
+    READ_POOL_SIZE = 4
+
     def __init__(self, db_path: str = "data/recorder.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._local = threading.local()
-        self._init_db()
+        self._closed = False
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """스레드별 연결 가져오기"""
-        if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = sqlite3.connect(
+        # 쓰기 전용 연결 (스키마 생성 후 WAL 상태에서 읽기 풀을 연다)
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
+        self._init_db()
+        self._rows_since_analyze = 0  # _write_lock 보유 중에만 갱신
+
+        # update_recording 필드 조합별 SQL 캐시
+        self._update_sql_cache: Dict[frozenset, tuple] = {}
+
+        # 읽기 전용 연결 풀: WAL에서 쓰기 중에도 읽기가 막히지 않음
+        self._read_pool: queue.Queue = queue.Queue()
+        for _ in range(self.READ_POOL_SIZE):
+            self._read_pool.put(self._connect(read_only=True))
+
+        # 일일 통계 / 라이브 감지 쓰기는 큐에 모아 한 트랜잭션으로 처리
+        self._write_queue: queue.Queue = queue.Queue()
+        self._writer_wake = threading.Event()
+        self._writer_stop = threading.Event()
+        self._writer = threading.Thread(
+            target=self._writer_loop,
+            name="db-writer",
+            daemon=True
+        )
+        self._writer.start()
+
+        # 비정상 종료 경로에서도 큐 비우기 + PRAGMA optimize 실행
+        atexit.register(self.close)
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """새 연결 생성"""
+        if read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                isolation_level=None,
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                cached_statements=self.STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = sqlite3.connect(
                 str(self.db_path),
-                check_same_thread=False
+                isolation_level=None,  # 트랜잭션은 _cursor()에서 명시적으로 관리
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                cached_statements=self.STATEMENT_CACHE_SIZE
             )
-            self._local.connection.row_factory = sqlite3.Row
-        return self._local.connection
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        return conn
+
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """연결별 PRAGMA 설정"""
+        with Database._wal_lock:
+            if self.db_path not in Database._wal_initialized:
+                conn.execute('PRAGMA journal_mode=WAL')
+                Database._wal_initialized.add(self.db_path)
+
+        # WAL에서는 NORMAL로도 손상 없이 커밋당 fsync를 줄일 수 있음
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-32000')  # 32MB
+        conn.execute('PRAGMA mmap_size=268435456')  # 256MB
 
     @contextmanager
     def _cursor(self):
-        """커서 컨텍스트 매니저"""
-        conn = self._get_connection()
+        """
+        쓰기용 커서 컨텍스트 매니저 (전용 연결, 락으로 직렬화)
+
+        autocommit 연결에서 BEGIN IMMEDIATE ~ COMMIT을 직접 관리해
+        블록 안의 모든 문장을 한 트랜잭션(fsync 1회)으로 묶는다.
+        """
+        with self._write_lock:
+            cursor = self._write_conn.cursor()
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                yield cursor
+                cursor.execute('COMMIT')
+            except Exception as e:
+                if self._write_conn.in_transaction:
+                    cursor.execute('ROLLBACK')
+                raise e
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _read_cursor(self):
+        """읽기용 커서 컨텍스트 매니저 (읽기 전용 풀에서 연결 대여)"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("데이터베이스가 이미 닫혔습니다")
+        conn = self._read_pool.get()
         cursor = conn.cursor()
         try:
             yield cursor
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
         finally:
             cursor.close()
+            self._read_pool.put(conn)
 
     def _init_db(self):
         """데이터베이스 초기화"""
@@ -138,61 +304,175 @@ class Database:
             ''')
 
             # 인덱스 생성
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_recordings_username ON recordings(username)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_recordings_status ON recordings(status)')
+            # 유저별 목록(ORDER BY started_at DESC)을 정렬 없이 인덱스 순서로 읽음
+            cursor.execute('DROP INDEX IF EXISTS idx_recordings_username')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_recordings_user_started
+                ON recordings(username, started_at DESC, id)
+            ''')
+            # status 단독 인덱스는 선택도가 낮아 아래 부분 인덱스/started_at 인덱스로 대체
+            cursor.execute('DROP INDEX IF EXISTS idx_recordings_status')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_recordings_started_at ON recordings(started_at)')
+            # get_failed_recordings_for_retry 전용 부분 인덱스 (실패 건만 started_at 범위 스캔)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_recordings_retry
+                ON recordings(started_at, retry_count)
+                WHERE status = 'failed'
+            ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_live_detections_username ON live_detections(username)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_live_detections_bid ON live_detections(broadcast_id)')
+
+            self._init_totals(cursor)
 
         logger.info(f"데이터베이스 초기화 완료: {self.db_path}")
 
+    def _init_totals(self, cursor: sqlite3.Cursor):
+        """누적 통계 테이블 및 트리거 초기화 (get_total_stats를 O(1) 조회로)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS totals (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS seen_users (
+                username TEXT PRIMARY KEY
+            ) WITHOUT ROWID
+        ''')
+
+        # recordings 변경 시 누적값을 같은 트랜잭션에서 증분 갱신
+        # (update_recording으로 status/크기가 바뀌는 경우도 반영)
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_recordings_totals_insert
+            AFTER INSERT ON recordings
+            BEGIN
+                UPDATE totals SET value = value + CASE key
+                    WHEN 'total_recordings' THEN 1
+                    WHEN 'completed' THEN NEW.status IS 'completed'
+                    WHEN 'failed' THEN NEW.status IS 'failed'
+                    WHEN 'total_duration' THEN IFNULL(NEW.duration_seconds, 0)
+                    WHEN 'total_size' THEN IFNULL(NEW.file_size, 0)
+                    ELSE 0 END;
+                INSERT OR IGNORE INTO seen_users (username) VALUES (NEW.username);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_recordings_totals_update
+            AFTER UPDATE OF status, duration_seconds, file_size, username ON recordings
+            BEGIN
+                UPDATE totals SET value = value + CASE key
+                    WHEN 'completed' THEN (NEW.status IS 'completed') - (OLD.status IS 'completed')
+                    WHEN 'failed' THEN (NEW.status IS 'failed') - (OLD.status IS 'failed')
+                    WHEN 'total_duration' THEN IFNULL(NEW.duration_seconds, 0) - IFNULL(OLD.duration_seconds, 0)
+                    WHEN 'total_size' THEN IFNULL(NEW.file_size, 0) - IFNULL(OLD.file_size, 0)
+                    ELSE 0 END;
+                INSERT OR IGNORE INTO seen_users (username) VALUES (NEW.username);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_recordings_totals_delete
+            AFTER DELETE ON recordings
+            BEGIN
+                UPDATE totals SET value = value - CASE key
+                    WHEN 'total_recordings' THEN 1
+                    WHEN 'completed' THEN OLD.status IS 'completed'
+                    WHEN 'failed' THEN OLD.status IS 'failed'
+                    WHEN 'total_duration' THEN IFNULL(OLD.duration_seconds, 0)
+                    WHEN 'total_size' THEN IFNULL(OLD.file_size, 0)
+                    ELSE 0 END;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_seen_users_insert
+            AFTER INSERT ON seen_users
+            BEGIN
+                UPDATE totals SET value = value + 1 WHERE key = 'unique_users';
+            END
+        ''')
+
+        # 기존 DB라면 최초 1회 recordings 전체에서 누적값 채우기
+        cursor.execute('SELECT COUNT(*) FROM totals')
+        if cursor.fetchone()[0] == 0:
+            cursor.execute('''
+                INSERT OR IGNORE INTO seen_users (username)
+                SELECT DISTINCT username FROM recordings
+            ''')
+            cursor.execute('''
+                INSERT INTO totals (key, value)
+                SELECT 'total_recordings', COUNT(*) FROM recordings
+                UNION ALL SELECT 'completed', COUNT(*) FROM recordings WHERE status = 'completed'
+                UNION ALL SELECT 'failed', COUNT(*) FROM recordings WHERE status = 'failed'
+                UNION ALL SELECT 'total_duration', IFNULL(SUM(duration_seconds), 0) FROM recordings
+                UNION ALL SELECT 'total_size', IFNULL(SUM(file_size), 0) FROM recordings
+                UNION ALL SELECT 'unique_users', COUNT(*) FROM seen_users
+            ''')
+
     # ==================== 녹화 기록 ====================
 
+    @staticmethod
+    def _recording_params(record: RecordingRecord) -> tuple:
+        """INSERT 파라미터 튜플 생성"""
+        return (
+            record.broadcast_id,
+            record.username,
+            record.display_name,
+            record.title,
+            record.started_at,
+            record.ended_at,
+            record.duration_seconds,
+            record.file_path,
+            record.file_size,
+            record.status,
+            record.error_message,
+            record.cloud_uploaded,
+            record.cloud_url,
+            record.retry_count
+        )
+
     def add_recording(self, record: RecordingRecord) -> int:
         """녹화 기록 추가"""
         with self._cursor() as cursor:
-            cursor.execute('''
-                INSERT INTO recordings (
-                    broadcast_id, username, display_name, title,
-                    started_at, ended_at, duration_seconds,
-                    file_path, file_size, status, error_message,
-                    cloud_uploaded, cloud_url, retry_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record.broadcast_id,
-                record.username,
-                record.display_name,
-                record.title,
-                record.started_at,
-                record.ended_at,
-                record.duration_seconds,
-                record.file_path,
-                record.file_size,
-                record.status,
-                record.error_message,
-                record.cloud_uploaded,
-                record.cloud_url,
-                record.retry_count
-            ))
+            cursor.execute(_INSERT_RECORDING_SQL, self._recording_params(record))
             return cursor.lastrowid
 
+    def add_recordings(self, records: List[RecordingRecord]) -> int:
+        """녹화 기록 일괄 추가 (한 트랜잭션, 커밋 1회)"""
+        if not records:
+            return 0
+
+        with self._cursor() as cursor:
+            cursor.executemany(
+                _INSERT_RECORDING_SQL,
+                [self._recording_params(record) for record in records]
+            )
+            self._rows_since_analyze += len(records)
+        return len(records)
+
     def update_recording(self, record_id: int, **kwargs):
         """녹화 기록 업데이트"""
         if not kwargs:
             return
 
-        set_clause = ', '.join(f"{k} = ?" for k in kwargs.keys())
-        values = list(kwargs.values()) + [record_id]
+        # 같은 필드 조합이면 동일한 SQL 문자열을 재사용 (statement cache 적중)
+        key = frozenset(kwargs)
+        cached = self._update_sql_cache.get(key)
+        if cached is None:
+            columns = tuple(sorted(key))
+            set_clause = ', '.join(f"{k} = ?" for k in columns)
+            cached = (f'UPDATE recordings SET {set_clause} WHERE id = ?', columns)
+            self._update_sql_cache[key] = cached
+
+        sql, columns = cached
+        values = [kwargs[k] for k in columns]
+        values.append(record_id)
 
         with self._cursor() as cursor:
-            cursor.execute(
-                f'UPDATE recordings SET {set_clause} WHERE id = ?',
-                values
-            )
+            cursor.execute(sql, values)
 
     def get_recording(self, record_id: int) -> Optional[RecordingRecord]:
         """녹화 기록 조회"""
-        with self._cursor() as cursor:
-            cursor.execute('SELECT * FROM recordings WHERE id = ?', (record_id,))
+        with self._read_cursor() as cursor:
+            cursor.execute(_SELECT_RECORDING_SQL, (record_id,))
             row = cursor.fetchone()
             if row:
                 return self._row_to_recording(row)
@@ -205,9 +485,9 @@ class Database:
         offset: int = 0
     ) -> List[RecordingRecord]:
         """유저별 녹화 기록 조회"""
-        with self._cursor() as cursor:
-            cursor.execute('''
-                SELECT * FROM recordings
+        with self._read_cursor() as cursor:
+            cursor.execute(f'''
+                SELECT {_RECORDING_COLUMNS} FROM recordings
                 WHERE username = ?
                 ORDER BY started_at DESC
                 LIMIT ? OFFSET ?
@@ -220,17 +500,17 @@ class Database:
         status: str = None
     ) -> List[RecordingRecord]:
         """최근 녹화 기록 조회"""
-        with self._cursor() as cursor:
+        with self._read_cursor() as cursor:
             if status:
-                cursor.execute('''
-                    SELECT * FROM recordings
+                cursor.execute(f'''
+                    SELECT {_RECORDING_COLUMNS} FROM recordings
                     WHERE status = ?
                     ORDER BY started_at DESC
                     LIMIT ?
                 ''', (status, limit))
             else:
-                cursor.execute('''
-                    SELECT * FROM recordings
+                cursor.execute(f'''
+                    SELECT {_RECORDING_COLUMNS} FROM recordings
                     ORDER BY started_at DESC
                     LIMIT ?
                 ''', (limit,))
@@ -243,9 +523,9 @@ class Database:
     ) -> List[RecordingRecord]:
         """재시도할 실패한 녹화 조회"""
         since = datetime.now() - timedelta(hours=since_hours)
-        with self._cursor() as cursor:
-            cursor.execute('''
-                SELECT * FROM recordings
+        with self._read_cursor() as cursor:
+            cursor.execute(f'''
+                SELECT {_RECORDING_COLUMNS} FROM recordings
                 WHERE status = 'failed'
                 AND retry_count < ?
                 AND started_at > ?
@@ -254,25 +534,8 @@ class Database:
             return [self._row_to_recording(row) for row in cursor.fetchall()]
 
     def _row_to_recording(self, row: sqlite3.Row) -> RecordingRecord:
-        """Row를 RecordingRecord로 변환"""
-        return RecordingRecord(
-            id=row['id'],
-            broadcast_id=row['broadcast_id'],
-            username=row['username'],
-            display_name=row['display_name'],
-            title=row['title'],
-            started_at=self._parse_datetime(row['started_at']),
-            ended_at=self._parse_datetime(row['ended_at']),
-            duration_seconds=row['duration_seconds'],
-            file_path=row['file_path'],
-            file_size=row['file_size'],
-            status=row['status'],
-            error_message=row['error_message'] or "",
-            cloud_uploaded=bool(row['cloud_uploaded']),
-            cloud_url=row['cloud_url'] or "",
-            retry_count=row['retry_count'],
-            created_at=self._parse_datetime(row['created_at'])
-        )
+        """Row를 RecordingRecord로 변환 (컬럼 순서 = 필드 순서, 타입 변환은 sqlite3 converter)"""
+        return RecordingRecord(*row)
 
     # ==================== 라이브 감지 ====================
 
@@ -283,24 +546,28 @@ class Database:
         display_name: str = "",
         title: str = "",
         viewer_count: int = 0
-    ) -> int:
-        """라이브 감지 기록 추가"""
-        with self._cursor() as cursor:
-            cursor.execute('''
-                INSERT INTO live_detections (
-                    broadcast_id, username, display_name, title, viewer_count
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (broadcast_id, username, display_name, title, viewer_count))
-            return cursor.lastrowid
+    ):
+        """라이브 감지 기록 추가 (백그라운드 writer가 일괄 저장)"""
+        self.add_live_detections([
+            (broadcast_id, username, display_name, title, viewer_count)
+        ])
+
+    def add_live_detections(self, rows: List[tuple]):
+        """
+        라이브 감지 기록 일괄 추가
+
+        Args:
+            rows: (broadcast_id, username, display_name, title, viewer_count) 튜플 리스트
+        """
+        if rows:
+            self._write_queue.put(('detections', rows))
 
     def mark_live_recorded(self, broadcast_id: str):
         """라이브 녹화 완료 표시"""
+        # 아직 큐에 있는 감지 기록이 먼저 저장되도록
+        self.flush()
         with self._cursor() as cursor:
-            cursor.execute('''
-                UPDATE live_detections
-                SET recorded = TRUE
-                WHERE broadcast_id = ?
-            ''', (broadcast_id,))
+            cursor.execute(_MARK_LIVE_RECORDED_SQL, (broadcast_id,))
 
     # ==================== 일일 통계 ====================
 
@@ -313,47 +580,27 @@ class Database:
         duration: int = 0,
         size: int = 0
     ):
-        """오늘의 통계 업데이트 (증분)"""
+        """오늘의 통계 업데이트 (증분, 백그라운드 writer가 날짜별로 합산해 저장)"""
         today = datetime.now().strftime('%Y-%m-%d')
-
-        with self._cursor() as cursor:
-            cursor.execute('''
-                INSERT INTO daily_stats (
-                    date, total_checks, lives_detected,
-                    recordings_completed, recordings_failed,
-                    total_duration_seconds, total_size_bytes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date) DO UPDATE SET
-                    total_checks = total_checks + excluded.total_checks,
-                    lives_detected = lives_detected + excluded.lives_detected,
-                    recordings_completed = recordings_completed + excluded.recordings_completed,
-                    recordings_failed = recordings_failed + excluded.recordings_failed,
-                    total_duration_seconds = total_duration_seconds + excluded.total_duration_seconds,
-                    total_size_bytes = total_size_bytes + excluded.total_size_bytes,
-                    updated_at = CURRENT_TIMESTAMP
-            ''', (today, checks, lives_detected, completed, failed, duration, size))
+        self._write_queue.put((
+            'stats',
+            (today, checks, lives_detected, completed, failed, duration, size)
+        ))
 
     def get_daily_stats(self, date: str = None) -> Optional[DailyStats]:
         """일일 통계 조회"""
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
 
-        with self._cursor() as cursor:
+        self.flush()
+        with self._read_cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM daily_stats WHERE date = ?',
+                f'SELECT {_DAILY_STATS_COLUMNS} FROM daily_stats WHERE date = ?',
                 (date,)
             )
             row = cursor.fetchone()
             if row:
-                return DailyStats(
-                    date=row['date'],
-                    total_checks=row['total_checks'],
-                    lives_detected=row['lives_detected'],
-                    recordings_completed=row['recordings_completed'],
-                    recordings_failed=row['recordings_failed'],
-                    total_duration_seconds=row['total_duration_seconds'],
-                    total_size_bytes=row['total_size_bytes']
-                )
+                return DailyStats(*row)
         return None
 
     def get_stats_range(
@@ -362,67 +609,130 @@ class Database:
         end_date: str
     ) -> List[DailyStats]:
         """기간별 통계 조회"""
-        with self._cursor() as cursor:
-            cursor.execute('''
-                SELECT * FROM daily_stats
+        self.flush()
+        with self._read_cursor() as cursor:
+            cursor.execute(f'''
+                SELECT {_DAILY_STATS_COLUMNS} FROM daily_stats
                 WHERE date BETWEEN ? AND ?
                 ORDER BY date DESC
             ''', (start_date, end_date))
-            return [
-                DailyStats(
-                    date=row['date'],
-                    total_checks=row['total_checks'],
-                    lives_detected=row['lives_detected'],
-                    recordings_completed=row['recordings_completed'],
-                    recordings_failed=row['recordings_failed'],
-                    total_duration_seconds=row['total_duration_seconds'],
-                    total_size_bytes=row['total_size_bytes']
-                )
-                for row in cursor.fetchall()
-            ]
+            return [DailyStats(*row) for row in cursor.fetchall()]
 
     def get_total_stats(self) -> Dict[str, Any]:
-        """전체 통계 조회"""
-        with self._cursor() as cursor:
-            cursor.execute('''
-                SELECT
-                    COUNT(*) as total_recordings,
-                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                    SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed,
-                    SUM(duration_seconds) as total_duration,
-                    SUM(file_size) as total_size,
-                    COUNT(DISTINCT username) as unique_users
-                FROM recordings
-            ''')
-            row = cursor.fetchone()
+        """전체 통계 조회 (트리거로 유지되는 totals 테이블 조회)"""
+        with self._read_cursor() as cursor:
+            cursor.execute('SELECT key, value FROM totals')
+            totals = dict(cursor.fetchall())
 
             return {
-                'total_recordings': row['total_recordings'] or 0,
-                'completed': row['completed'] or 0,
-                'failed': row['failed'] or 0,
-                'total_duration_seconds': row['total_duration'] or 0,
-                'total_size_bytes': row['total_size'] or 0,
-                'unique_users': row['unique_users'] or 0
+                'total_recordings': totals.get('total_recordings', 0),
+                'completed': totals.get('completed', 0),
+                'failed': totals.get('failed', 0),
+                'total_duration_seconds': totals.get('total_duration', 0),
+                'total_size_bytes': totals.get('total_size', 0),
+                'unique_users': totals.get('unique_users', 0)
             }
 
-    # ==================== 유틸리티 ====================
+    # ==================== 백그라운드 쓰기 ====================
+
+    def _writer_loop(self):
+        """대기 중인 쓰기를 주기적으로 한 트랜잭션에 모아 커밋"""
+        while not self._writer_stop.is_set():
+            self._writer_wake.wait(self.WRITE_BATCH_INTERVAL)
+            self._writer_wake.clear()
+            self._flush_pending()
+
+        self._flush_pending()
+
+    def _flush_pending(self):
+        """큐에 쌓인 쓰기를 한 트랜잭션으로 처리"""
+        stats: Dict[str, List[int]] = {}
+        detections: List[tuple] = []
+        waiters: List[threading.Event] = []
+
+        while True:
+            try:
+                kind, payload = self._write_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == 'stats':
+                # 같은 날짜의 증분은 합산해서 upsert 1회로
+                date, *deltas = payload
+                merged = stats.get(date)
+                if merged is None:
+                    stats[date] = deltas
+                else:
+                    for i, delta in enumerate(deltas):
+                        merged[i] += delta
+            elif kind == 'detections':
+                detections.extend(payload)
+            elif kind == 'flush':
+                waiters.append(payload)
 
-    def _parse_datetime(self, value) -> Optional[datetime]:
-        """datetime 파싱"""
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
         try:
-            return datetime.fromisoformat(str(value))
-        except:
-            return None
+            if stats or detections:
+                run_analyze = False
+                with self._cursor() as cursor:
+                    if detections:
+                        cursor.executemany(_INSERT_LIVE_DETECTION_SQL, detections)
+                    if stats:
+                        cursor.executemany(
+                            _UPSERT_DAILY_STATS_SQL,
+                            [(date, *deltas) for date, deltas in stats.items()]
+                        )
+
+                    # 일정량 이상 쓰였으면 플래너 통계(sqlite_stat1) 갱신 (카운터는 락 안에서)
+                    self._rows_since_analyze += len(detections) + len(stats)
+                    if self._rows_since_analyze >= self.ANALYZE_ROW_THRESHOLD:
+                        self._rows_since_analyze = 0
+                        run_analyze = True
+
+                # ANALYZE는 트랜잭션 커밋 후 실행
+                if run_analyze:
+                    with self._write_lock:
+                        self._write_conn.execute('ANALYZE')
+        except Exception as e:
+            logger.error(f"DB 일괄 쓰기 실패: {e}")
+        finally:
+            for waiter in waiters:
+                waiter.set()
+
+    def flush(self, timeout: float = 5.0):
+        """대기 중인 백그라운드 쓰기가 커밋될 때까지 대기"""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._write_queue.put(('flush', done))
+        self._writer_wake.set()
+        done.wait(timeout)
+
+    # ==================== 유틸리티 ====================
 
     def close(self):
-        """연결 종료"""
-        if hasattr(self._local, 'connection') and self._local.connection:
-            self._local.connection.close()
-            self._local.connection = None
+        """연결 종료 (대기 중인 백그라운드 쓰기를 먼저 커밋)"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._writer.is_alive():
+            self._writer_stop.set()
+            self._writer_wake.set()
+            self._writer.join(timeout=5.0)
+
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+        # 종료 전 PRAGMA optimize로 플래너 통계 갱신
+        with self._write_lock:
+            try:
+                self._write_conn.execute('PRAGMA optimize')
+            except sqlite3.Error as e:
+                logger.debug(f"PRAGMA optimize 실패: {e}")
+            self._write_conn.close()
 
 
 def create_database(config) -> Database:
@@ -9,19 +9,193 @@
 """
 import os
 import re
+import copy
+import string
 import json
+import sys
+import threading
 import yaml
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
+# libyaml(C) 기반 로더가 있으면 사용 (순수 Python SafeLoader보다 수 배 빠름)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Python 3.10+에서는 __slots__ 기반 dataclass 사용 (인스턴스 메모리/속성 접근 개선)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# orjson이 있으면 사용 (표준 json보다 수 배 빠름), 없으면 표준 json으로 대체
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# ${ENV_VAR} 치환 패턴
+_ENV_VAR_RE = re.compile(r'\$\{([^}]+)\}')
+
+# Instagram 유저네임 허용 문자 (영문/숫자/._, 1-30자)
+_ALLOWED_USERNAME = frozenset(string.ascii_letters + string.digits + '._')
+
+
+def _is_valid_username(u: str) -> bool:
+    """Instagram 유저네임 형식 검사"""
+    return 1 <= len(u) <= 30 and _ALLOWED_USERNAME.issuperset(u)
+
+# 설정 값 허용 목록 (튜플은 오류 메시지 표시 순서용, frozenset은 O(1) 검사용)
+_QUALITY_CHOICES = ('best', '1080p', '720p', '480p', '360p')
+_FORMAT_CHOICES = ('mp4', 'mkv', 'webm', 'ts')
+_LEVEL_CHOICES = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+_VALID_QUALITIES = frozenset(_QUALITY_CHOICES)
+_VALID_FORMATS = frozenset(_FORMAT_CHOICES)
+_VALID_LEVELS = frozenset(_LEVEL_CHOICES)
+_VALID_PRIORITIES = frozenset(('high', 'normal', 'low'))
+
+# 환경 변수로 덮어쓸 수 있는 민감정보: (Config 필드, YAML 경로, 환경 변수)
+_ENV_BINDINGS = (
+    ('ig_username', ('instagram', 'username'), 'IG_USERNAME'),
+    ('ig_password', ('instagram', 'password'), 'IG_PASSWORD'),
+    ('ig_totp_secret', ('instagram', 'totp_secret'), 'IG_TOTP_SECRET'),
+    ('telegram_token', ('notifications', 'telegram', 'bot_token'), 'TELEGRAM_BOT_TOKEN'),
+    ('telegram_chat_id', ('notifications', 'telegram', 'chat_id'), 'TELEGRAM_CHAT_ID'),
+    ('discord_webhook_url', ('notifications', 'discord', 'webhook_url'), 'DISCORD_WEBHOOK_URL'),
+    ('r2_account_id', ('cloud_storage', 'r2', 'account_id'), 'R2_ACCOUNT_ID'),
+    ('r2_access_key', ('cloud_storage', 'r2', 'access_key_id'), 'R2_ACCESS_KEY'),
+    ('r2_secret_key', ('cloud_storage', 'r2', 'secret_access_key'), 'R2_SECRET_KEY'),
+)
+
+# 일반 설정 필드 매핑: (Config 필드, YAML 경로)
+_FIELDS = (
+    # Instagram
+    ('session_file', ('instagram', 'session_file')),
+    # Monitor
+    ('check_interval', ('monitor', 'check_interval')),
+    ('batch_size', ('monitor', 'batch_size')),
+    ('batch_delay', ('monitor', 'batch_delay')),
+    ('targets_file', ('monitor', 'targets_file')),
+    # Recorder
+    ('output_dir', ('recorder', 'output_dir')),
+    ('filename_format', ('recorder', 'filename_format')),
+    ('output_format', ('recorder', 'output_format')),
+    ('max_concurrent', ('recorder', 'max_concurrent')),
+    ('quality', ('recorder', 'quality')),
+    ('min_disk_space_mb', ('recorder', 'min_disk_space_mb')),
+    ('recording_max_retries', ('recorder', 'max_retries')),
+    ('recording_retry_delay', ('recorder', 'retry_delay')),
+    # Database
+    ('db_path', ('database', 'path')),
+    # Cloud Storage
+    ('cloud_enabled', ('cloud_storage', 'enabled')),
+    ('cloud_provider', ('cloud_storage', 'provider')),
+    ('r2_bucket', ('cloud_storage', 'r2', 'bucket_name')),
+    ('r2_public_url', ('cloud_storage', 'r2', 'public_url')),
+    ('delete_after_upload', ('cloud_storage', 'r2', 'delete_after_upload')),
+    # Notifications
+    ('notify_enabled', ('notifications', 'enabled')),
+    ('notify_provider', ('notifications', 'provider')),
+    ('notify_live_detected', ('notifications', 'notify_on', 'live_detected')),
+    ('notify_recording_started', ('notifications', 'notify_on', 'recording_started')),
+    ('notify_recording_finished', ('notifications', 'notify_on', 'recording_finished')),
+    ('notify_recording_failed', ('notifications', 'notify_on', 'recording_failed')),
+    ('notify_daily_summary', ('notifications', 'notify_on', 'daily_summary')),
+    ('daily_summary_hour', ('notifications', 'daily_summary_time', 'hour')),
+    ('daily_summary_minute', ('notifications', 'daily_summary_time', 'minute')),
+    # Logging
+    ('log_level', ('logging', 'level')),
+    ('log_file', ('logging', 'file')),
+    ('log_max_size', ('logging', 'max_size_mb')),
+    ('log_backup_count', ('logging', 'backup_count')),
+    # Advanced
+    ('proxy', ('advanced', 'proxy')),
+    ('user_agent', ('advanced', 'user_agent')),
+    ('max_retries', ('advanced', 'max_retries')),
+    ('retry_delay', ('advanced', 'retry_delay')),
+)
+
+_MISSING = object()
+
+
+# 파싱 결과 캐시: 경로 -> ((mtime_ns, size), 파싱된 데이터)
+_PARSE_CACHE_MAX = 32
+_yaml_cache: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+_json_cache: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
 
 class ConfigValidationError(Exception):
     """설정 검증 오류"""
     pass
 
 
+def _cached_parse(
+    cache: "OrderedDict[str, Tuple[Tuple[int, int], Any]]",
+    path: Path,
+    parse: Callable[[Path], Any]
+) -> Any:
+    """
+    파일 파싱 결과를 (mtime_ns, size) 기준으로 캐시 (LRU)
+
+    호출자가 결과를 수정해도 캐시가 오염되지 않도록 항상 복사본을 반환
+    """
+    st = path.stat()
+    key = str(path.resolve())
+    signature = (st.st_mtime_ns, st.st_size)
+
+    with _parse_cache_lock:
+        cached = cache.get(key)
+        if cached is not None and cached[0] == signature:
+            cache.move_to_end(key)
+            return copy.deepcopy(cached[1])
+
+    data = parse(path)
+
+    with _parse_cache_lock:
+        cache[key] = (signature, data)
+        cache.move_to_end(key)
+        while len(cache) > _PARSE_CACHE_MAX:
+            cache.popitem(last=False)
+
+    return copy.deepcopy(data)
+
+
+def _parse_yaml(path: Path) -> Any:
+    # 바이너리로 넘겨 libyaml이 C 레벨에서 직접 디코딩하도록 함
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+def _parse_json(path: Path) -> Any:
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return _json_loads(raw)
+    except json.JSONDecodeError:
+        # 라인/컬럼이 정확한 오류 메시지를 위해 표준 json으로 다시 파싱
+        json.loads(raw)
+        raise
+
+
+def _lookup(data: Dict[str, Any], path: Tuple[str, ...], default: Any) -> Any:
+    """중첩 dict에서 경로 값 조회 (값이 null인 섹션은 빈 dict로 취급)"""
+    node = data
+    for key in path[:-1]:
+        node = node.get(key) or {}
+    return node.get(path[-1], default)
+
+
 def _get_env(key: str, default: str = "") -> str:
     """환경 변수에서 값 가져오기 (민감정보용)"""
     return os.environ.get(key, default)
@@ -36,18 +210,20 @@ def _resolve_value(yaml_value: str, env_key: str) -> str:
     if not yaml_value:
         return _get_env(env_key, "")
     
-    # ${ENV_VAR} 패턴 치환
-    pattern = r'\$\{([^}]+)\}'
+    # 치환할 패턴이 없으면 정규식 생략 (대부분의 경우)
+    if '${' not in yaml_value:
+        return yaml_value
     
+    # ${ENV_VAR} 패턴 치환
     def replace_env(match):
         env_name = match.group(1)
         return os.environ.get(env_name, "")
     
-    resolved = re.sub(pattern, replace_env, yaml_value)
+    resolved = _ENV_VAR_RE.sub(replace_env, yaml_value)
     return resolved
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TargetUser:
     """모니터링 대상 유저"""
     username: str
@@ -56,28 +232,20 @@ class TargetUser:
     priority: str = "normal"
     enabled: bool = True
     notes: str = ""
+    # 로드 이후 user_id가 변경되어 파일에 저장이 필요한지 여부
+    _dirty: bool = field(default=False, init=False, repr=False, compare=False)
     
-    def __post_init__(self):
-        # 유저네임 검증
-        if not self.username:
-            raise ConfigValidationError("username은 필수입니다")
-        
-        # 유저네임 형식 검증 (Instagram 규칙)
-        if not re.match(r'^[a-zA-Z0-9._]{1,30}$', self.username):
-            raise ConfigValidationError(
-                f"유효하지 않은 username: {self.username}"
-            )
-        
-        # 우선순위 검증
-        if self.priority not in ('high', 'normal', 'low'):
-            self.priority = 'normal'
+    def __setattr__(self, name: str, value: Any):
+        if name == 'user_id' and getattr(self, 'user_id', value) != value:
+            object.__setattr__(self, '_dirty', True)
+        object.__setattr__(self, name, value)
     
     @property
     def display_name(self) -> str:
         return self.alias or self.username
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Config:
     """전체 설정"""
     # Instagram
@@ -144,8 +312,56 @@ class Config:
     # Runtime
     targets: List[TargetUser] = field(default_factory=list)
     
-    def __post_init__(self):
-        """설정 검증"""
+    def validate(self):
+        """
+        설정 검증 (load_config에서 호출)
+        
+        생성 시점이 아닌 외부 설정을 로드할 때만 검증하므로
+        dataclasses.replace()나 복사에는 검증 비용이 들지 않음
+        
+        Raises:
+            ConfigValidationError: 설정 검증 실패 시
+        """
+        # 알림 검증
+        if self.notify_enabled:
+            if self.notify_provider == "telegram":
+                if not self.telegram_token or not self.telegram_chat_id:
+                    self.notify_enabled = False
+            elif self.notify_provider == "discord":
+                if not self.discord_webhook_url:
+                    self.notify_enabled = False
+            else:
+                # 알 수 없는 provider
+                self.notify_enabled = False
+        
+        # 대부분의 설정은 통과하므로 단일 조건식으로 먼저 판정하고,
+        # 실패한 경우에만 상세 오류 목록을 만든다
+        if not self._is_valid():
+            raise ConfigValidationError(
+                "설정 검증 실패:\n" + "\n".join(f"  - {e}" for e in self._collect_errors())
+            )
+    
+    def _is_valid(self) -> bool:
+        """모든 검증 조건을 만족하는지 빠르게 판정"""
+        return bool(
+            self.ig_username
+            and self.ig_password
+            and 60 <= self.check_interval <= 3600
+            and 1 <= self.batch_size <= 100
+            and self.batch_delay >= 1
+            and 1 <= self.max_concurrent <= 10
+            and self.quality in _VALID_QUALITIES
+            and self.output_format in _VALID_FORMATS
+            and self.log_level.upper() in _VALID_LEVELS
+            and (
+                not self.cloud_enabled
+                or self.cloud_provider != "r2"
+                or (self.r2_account_id and self.r2_access_key and self.r2_secret_key)
+            )
+        )
+    
+    def _collect_errors(self) -> List[str]:
+        """검증 실패 항목별 상세 메시지 수집"""
         errors = []
         
         # Instagram 계정 검증
@@ -170,19 +386,16 @@ class Config:
             errors.append("max_concurrent는 1-10 사이여야 합니다")
         
         # 품질 검증
-        valid_qualities = ('best', '1080p', '720p', '480p', '360p')
-        if self.quality not in valid_qualities:
-            errors.append(f"quality는 {valid_qualities} 중 하나여야 합니다")
+        if self.quality not in _VALID_QUALITIES:
+            errors.append(f"quality는 {_QUALITY_CHOICES} 중 하나여야 합니다")
         
         # 출력 포맷 검증
-        valid_formats = ('mp4', 'mkv', 'webm', 'ts')
-        if self.output_format not in valid_formats:
-            errors.append(f"output_format은 {valid_formats} 중 하나여야 합니다")
+        if self.output_format not in _VALID_FORMATS:
+            errors.append(f"output_format은 {_FORMAT_CHOICES} 중 하나여야 합니다")
         
         # 로그 레벨 검증
-        valid_levels = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
-        if self.log_level.upper() not in valid_levels:
-            errors.append(f"log_level은 {valid_levels} 중 하나여야 합니다")
+        if self.log_level.upper() not in _VALID_LEVELS:
+            errors.append(f"log_level은 {_LEVEL_CHOICES} 중 하나여야 합니다")
         
         # 클라우드 저장소 검증
         if self.cloud_enabled:
@@ -194,23 +407,7 @@ class Config:
                 if not self.r2_secret_key:
                     errors.append("R2 사용 시 r2.secret_access_key는 필수입니다")
         
-        # 알림 검증
-        if self.notify_enabled:
-            if self.notify_provider == "telegram":
-                if not self.telegram_token or not self.telegram_chat_id:
-                    self.notify_enabled = False
-            elif self.notify_provider == "discord":
-                if not self.discord_webhook_url:
-                    self.notify_enabled = False
-            else:
-                # 알 수 없는 provider
-                self.notify_enabled = False
-        
-        # 오류가 있으면 예외 발생
-        if errors:
-            raise ConfigValidationError(
-                "설정 검증 실패:\n" + "\n".join(f"  - {e}" for e in errors)
-            )
+        return errors
     
     def mask_sensitive(self) -> Dict[str, Any]:
         """민감정보를 마스킹한 설정 반환 (로깅용)"""
@@ -255,113 +452,23 @@ def load_config(config_path: str = "config/settings.yaml") -> Config:
         )
     
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
+        data = _cached_parse(_yaml_cache, config_file, _parse_yaml) or {}
     except yaml.YAMLError as e:
         raise ConfigValidationError(f"YAML 파싱 오류: {e}")
     
-    # 환경 변수와 YAML 값 결합
-    ig_username = _resolve_value(
-        data.get('instagram', {}).get('username', ''),
-        'IG_USERNAME'
-    )
-    ig_password = _resolve_value(
-        data.get('instagram', {}).get('password', ''),
-        'IG_PASSWORD'
-    )
-    ig_totp_secret = _resolve_value(
-        data.get('instagram', {}).get('totp_secret', ''),
-        'IG_TOTP_SECRET'
-    )
-    
-    telegram_token = _resolve_value(
-        data.get('notifications', {}).get('telegram', {}).get('bot_token', ''),
-        'TELEGRAM_BOT_TOKEN'
-    )
-    telegram_chat_id = _resolve_value(
-        data.get('notifications', {}).get('telegram', {}).get('chat_id', ''),
-        'TELEGRAM_CHAT_ID'
-    )
-    discord_webhook_url = _resolve_value(
-        data.get('notifications', {}).get('discord', {}).get('webhook_url', ''),
-        'DISCORD_WEBHOOK_URL'
-    )
-    
-    r2_account_id = _resolve_value(
-        data.get('cloud_storage', {}).get('r2', {}).get('account_id', ''),
-        'R2_ACCOUNT_ID'
-    )
-    r2_access_key = _resolve_value(
-        data.get('cloud_storage', {}).get('r2', {}).get('access_key_id', ''),
-        'R2_ACCESS_KEY'
-    )
-    r2_secret_key = _resolve_value(
-        data.get('cloud_storage', {}).get('r2', {}).get('secret_access_key', ''),
-        'R2_SECRET_KEY'
-    )
-    
-    config = Config(
-        # Instagram (환경 변수 지원)
-        ig_username=ig_username,
-        ig_password=ig_password,
-        ig_totp_secret=ig_totp_secret,
-        session_file=data.get('instagram', {}).get('session_file', 'data/sessions/session.json'),
-        
-        # Monitor
-        check_interval=data.get('monitor', {}).get('check_interval', 300),
-        batch_size=data.get('monitor', {}).get('batch_size', 50),
-        batch_delay=data.get('monitor', {}).get('batch_delay', 10),
-        targets_file=data.get('monitor', {}).get('targets_file', 'config/targets.json'),
-        
-        # Recorder
-        output_dir=data.get('recorder', {}).get('output_dir', 'data/recordings'),
-        filename_format=data.get('recorder', {}).get('filename_format', '{username}_%Y%m%d_%H%M%S'),
-        output_format=data.get('recorder', {}).get('output_format', 'mp4'),
-        max_concurrent=data.get('recorder', {}).get('max_concurrent', 5),
-        quality=data.get('recorder', {}).get('quality', 'best'),
-        min_disk_space_mb=data.get('recorder', {}).get('min_disk_space_mb', 500),
-        recording_max_retries=data.get('recorder', {}).get('max_retries', 3),
-        recording_retry_delay=data.get('recorder', {}).get('retry_delay', 30),
-
-        # Database
-        db_path=data.get('database', {}).get('path', 'data/recorder.db'),
-        
-        # Cloud Storage (환경 변수 지원)
-        cloud_enabled=data.get('cloud_storage', {}).get('enabled', False),
-        cloud_provider=data.get('cloud_storage', {}).get('provider', 'r2'),
-        r2_account_id=r2_account_id,
-        r2_access_key=r2_access_key,
-        r2_secret_key=r2_secret_key,
-        r2_bucket=data.get('cloud_storage', {}).get('r2', {}).get('bucket_name', 'instagram-lives'),
-        r2_public_url=data.get('cloud_storage', {}).get('r2', {}).get('public_url', ''),
-        delete_after_upload=data.get('cloud_storage', {}).get('r2', {}).get('delete_after_upload', False),
-        
-        # Notifications (환경 변수 지원)
-        notify_enabled=data.get('notifications', {}).get('enabled', True),
-        notify_provider=data.get('notifications', {}).get('provider', 'discord'),
-        telegram_token=telegram_token,
-        telegram_chat_id=telegram_chat_id,
-        discord_webhook_url=discord_webhook_url,
-        notify_live_detected=data.get('notifications', {}).get('notify_on', {}).get('live_detected', True),
-        notify_recording_started=data.get('notifications', {}).get('notify_on', {}).get('recording_started', True),
-        notify_recording_finished=data.get('notifications', {}).get('notify_on', {}).get('recording_finished', True),
-        notify_recording_failed=data.get('notifications', {}).get('notify_on', {}).get('recording_failed', True),
-        notify_daily_summary=data.get('notifications', {}).get('notify_on', {}).get('daily_summary', True),
-        daily_summary_hour=data.get('notifications', {}).get('daily_summary_time', {}).get('hour', 23),
-        daily_summary_minute=data.get('notifications', {}).get('daily_summary_time', {}).get('minute', 0),
-        
-        # Logging
-        log_level=data.get('logging', {}).get('level', 'INFO'),
-        log_file=data.get('logging', {}).get('file', 'data/logs/recorder.log'),
-        log_max_size=data.get('logging', {}).get('max_size_mb', 10),
-        log_backup_count=data.get('logging', {}).get('backup_count', 5),
-        
-        # Advanced
-        proxy=data.get('advanced', {}).get('proxy', ''),
-        user_agent=data.get('advanced', {}).get('user_agent', ''),
-        max_retries=data.get('advanced', {}).get('max_retries', 3),
-        retry_delay=data.get('advanced', {}).get('retry_delay', 30),
-    )
+    # 환경 변수와 YAML 값 결합 (민감정보 필드를 한 번에 해석)
+    kwargs = {}
+    for field_name, yaml_path, env_key in _ENV_BINDINGS:
+        kwargs[field_name] = _resolve_value(_lookup(data, yaml_path, ''), env_key)
+    
+    # 일반 필드: YAML에 값이 있는 것만 넘기고 나머지는 Config 기본값 사용
+    for field_name, yaml_path in _FIELDS:
+        value = _lookup(data, yaml_path, _MISSING)
+        if value is not _MISSING:
+            kwargs[field_name] = value
+    
+    config = Config(**kwargs)
+    config.validate()
     
     # 타겟 유저 로드
     config.targets = load_targets(config.targets_file)
@@ -393,8 +500,7 @@ def load_targets(targets_path: str) -> List[TargetUser]:
         return []
 
     try:
-        with open(targets_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _cached_parse(_json_cache, targets_file, _parse_json)
     except json.JSONDecodeError as e:
         raise ConfigValidationError(
             f"타겟 파일 JSON 파싱 오류: {targets_path}\n"
@@ -409,34 +515,41 @@ def load_targets(targets_path: str) -> List[TargetUser]:
     target_list = data.get('targets', []) if isinstance(data, dict) else data
 
     for i, item in enumerate(target_list):
-        try:
-            # 문자열인 경우 (간단한 형식)
-            if isinstance(item, str):
-                username = item.strip()
-                if not username:
-                    continue
-                target = TargetUser(username=username)
-            # 딕셔너리인 경우 (상세 형식)
-            elif isinstance(item, dict):
-                username = item.get('username', '').strip()
-                if not username:
-                    continue
-                target = TargetUser(
-                    username=username,
-                    user_id=item.get('user_id'),
-                    alias=item.get('alias'),
-                    priority=item.get('priority', 'normal'),
-                    enabled=item.get('enabled', True),
-                    notes=item.get('notes', '')
-                )
-            else:
-                continue
+        # 문자열인 경우 (간단한 형식)
+        if isinstance(item, str):
+            username = item.strip()
+            detail = None
+        # 딕셔너리인 경우 (상세 형식)
+        elif isinstance(item, dict):
+            username = item.get('username', '').strip()
+            detail = item
+        else:
+            continue
+
+        if not username:
+            continue
+
+        # 예외를 만들지 않고 미리 검사 (잘못된 항목이 많아도 저렴함)
+        if not _is_valid_username(username):
+            errors.append(f"타겟 #{i + 1}: 유효하지 않은 username: {username}")
+            continue
 
-            if target.enabled:
-                targets.append(target)
+        if detail is None:
+            targets.append(TargetUser(username=username))
+            continue
 
-        except ConfigValidationError as e:
-            errors.append(f"타겟 #{i + 1}: {e}")
+        if not detail.get('enabled', True):
+            continue
+
+        priority = detail.get('priority', 'normal')
+        targets.append(TargetUser(
+            username=username,
+            user_id=detail.get('user_id'),
+            alias=detail.get('alias'),
+            priority=priority if priority in _VALID_PRIORITIES else 'normal',
+            enabled=detail.get('enabled', True),
+            notes=detail.get('notes', '')
+        ))
 
     if errors:
         # 경고만 출력하고 계속 진행
@@ -451,25 +564,49 @@ def load_targets(targets_path: str) -> List[TargetUser]:
 def save_targets(targets: List[TargetUser], targets_path: str):
     """
     타겟 유저 목록 저장 (user_id 업데이트 등)
+
+    변경된(dirty) 타겟이 없으면 파일을 건드리지 않으며,
+    임시 파일에 쓴 뒤 교체하여 중간에 중단되어도 기존 파일이 깨지지 않음
     """
+    dirty = {t.username: t for t in targets if t._dirty}
+    if not dirty:
+        return
+    
     targets_file = Path(targets_path)
     
     # 기존 파일 로드
+    data = None
     if targets_file.exists():
-        with open(targets_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    else:
-        data = {"targets": []}
-    
-    # 타겟 업데이트
-    target_dict = {t.username: t for t in targets}
-    
-    for item in data.get('targets', []):
-        username = item.get('username')
-        if username in target_dict:
-            item['user_id'] = target_dict[username].user_id
+        data = _cached_parse(_json_cache, targets_file, _parse_json)
+    if not isinstance(data, dict):
+        data = {"targets": data if isinstance(data, list) else []}
+    
+    # 변경된 타겟만 갱신 (간단한 형식의 문자열 항목은 상세 형식으로 변환)
+    items = data.setdefault('targets', [])
+    for i, item in enumerate(items):
+        if isinstance(item, str):
+            target = dirty.get(item.strip())
+            if target is not None:
+                items[i] = {'username': target.username, 'user_id': target.user_id}
+        elif isinstance(item, dict):
+            target = dirty.get(item.get('username'))
+            if target is not None:
+                item['user_id'] = target.user_id
     
     data['last_updated'] = datetime.now().isoformat()
     
-    with open(targets_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # 직렬화를 먼저 끝낸 뒤 한 번에 쓰고, 디스크 반영 후 원자적으로 교체
+    payload = _json_dumps(data)
+    tmp_file = targets_file.with_name(targets_file.name + '.tmp')
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, targets_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    
+    for target in dirty.values():
+        target._dirty = False
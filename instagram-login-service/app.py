@@ -2,15 +2,78 @@
 Instagram Session Generator - Railway 배포용
 모바일에서 아이디/비밀번호 입력하면 session.json 다운로드 가능
 """
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
-from instagrapi import Client
+from cachetools import TTLCache
+import functools
+import hashlib
 import json
 import io
+import os
+import threading
 
 app = Flask(__name__)
 CORS(app)
 
+# 요청마다 재사용하는 Client 기본 설정
+_CLIENT_DEFAULTS = {'delay_range': [1, 3]}
+
+# 같은 계정의 반복/동시 요청이 매번 로그인하지 않도록 짧게 보관하는 세션 캐시
+# 키는 프로세스별 비밀키로 만든 해시이며 평문 계정 정보는 저장하지 않음
+_SESSION_CACHE = TTLCache(maxsize=16, ttl=60)
+_SESSION_CACHE_LOCK = threading.Lock()
+_SESSION_KEY_SECRET = os.urandom(32)
+# 키별 로그인 직렬화용 락 (고정 개수로 나눠 메모리 사용을 제한)
+_LOGIN_LOCKS = tuple(threading.Lock() for _ in range(16))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_client_cls():
+    """instagrapi는 임포트 비용이 커서 첫 로그인 요청 때 로드"""
+    from instagrapi import Client
+    return Client
+
+
+def _session_key(username: str, password: str) -> bytes:
+    return hashlib.blake2b(
+        f'{username}\0{password}'.encode('utf-8'),
+        digest_size=16,
+        key=_SESSION_KEY_SECRET
+    ).digest()
+
+
+def _login_settings(username: str, password: str) -> bytes:
+    """로그인 후 세션 JSON 바이트 반환 (캐시 적중 시 재로그인 생략)"""
+    key = _session_key(username, password)
+
+    with _SESSION_CACHE_LOCK:
+        cached = _SESSION_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    # 동일 계정의 동시 요청은 한 번만 로그인하고 나머지는 결과를 재사용
+    with _LOGIN_LOCKS[key[0] % len(_LOGIN_LOCKS)]:
+        with _SESSION_CACHE_LOCK:
+            cached = _SESSION_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        client = _get_client_cls()()
+        client.delay_range = _CLIENT_DEFAULTS['delay_range']
+        client.login(username, password)
+
+        # 중간 문자열 없이 버퍼에 바로 직렬화
+        buffer = io.BytesIO()
+        writer = io.TextIOWrapper(buffer, encoding='utf-8', newline='', write_through=True)
+        json.dump(client.get_settings(), writer, indent=2, default=str)
+        writer.flush()
+        writer.detach()
+        settings_bytes = buffer.getvalue()
+
+        with _SESSION_CACHE_LOCK:
+            _SESSION_CACHE[key] = settings_bytes
+        return settings_bytes
+
 HTML_PAGE = """
 <!DOCTYPE html>
 <html lang="ko">
@@ -155,9 +218,16 @@ HTML_PAGE = """
 </html>
 """
 
+# 템플릿 치환이 없는 정적 페이지이므로 미리 인코딩해 둠
+_INDEX_RESPONSE_BODY = HTML_PAGE.encode('utf-8')
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_PAGE)
+    return Response(
+        _INDEX_RESPONSE_BODY,
+        mimetype='text/html; charset=utf-8',
+        headers={'Cache-Control': 'public, max-age=3600'}
+    )
 
 @app.route('/api/generate', methods=['POST'])
 def generate_session():
@@ -170,20 +240,10 @@ def generate_session():
             return jsonify({'error': 'Username and password required'}), 400
 
         # Login to Instagram
-        client = Client()
-        client.delay_range = [1, 3]
-        client.login(username, password)
-
-        # Get session settings
-        settings = client.get_settings()
-
-        # Create file-like object
-        session_json = json.dumps(settings, indent=2, default=str)
-        buffer = io.BytesIO(session_json.encode('utf-8'))
-        buffer.seek(0)
+        settings_bytes = _login_settings(username, password)
 
         return send_file(
-            buffer,
+            io.BytesIO(settings_bytes),
             mimetype='application/json',
             as_attachment=True,
             download_name='session.json'
@@ -5,6 +5,16 @@ Instagram Story API
 
 사용법:
     uvicorn api:app --host 0.0.0.0 --port 8000
+    WEB_CONCURRENCY=4 python api.py  # 워커 수 지정
+    PAGE_AUTH_SECRET=... python api.py  # 페이지 쿠키 서명 키 (미설정 시 data/sessions/page_auth.key 자동 생성)
+
+워커마다 설정/Instagram 세션을 lifespan에서 각자 불러오고,
+다른 워커가 로그인해 세션이 바뀌면 다음 스토리 조회 때 세션 저장소에서 다시 불러옵니다.
+Instagram 호출은 워커 내에서 순차 처리되므로 워커 수가 곧 동시 호출 수입니다.
+워커를 너무 많이 띄우면 rate limit(429)에 걸리기 쉬우니 주의하세요.
+
+운영 환경에서는 정적 파일을 앞단 프록시에서 바로 제공하는 것을 권장합니다 (nginx 예시):
+    location /static/ { alias /home/opc/rakko/instagram-story-saver/static/; }
 
 엔드포인트:
     GET /api/story?username=target_user
@@ -13,19 +23,27 @@ Instagram Story API
 """
 
 import os
+import uuid
+import asyncio
+import hmac
+import time
+import hashlib
 import secrets
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Query, Depends, Security, UploadFile, File, Cookie, Response
+from fastapi import FastAPI, HTTPException, Query, Depends, Security, UploadFile, File, Cookie, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from cachetools import TTLCache
 import json
+import orjson
 from instagrapi import Client
 from instagrapi.exceptions import (
     BadPassword,
@@ -35,6 +53,7 @@ from instagrapi.exceptions import (
 )
 
 from src.utils.config import load_config, Config
+from src.storage.session_store import SessionStore
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -42,11 +61,65 @@ logger = get_logger()
 # Global instances
 config: Optional[Config] = None
 ig_client: Optional[Client] = None
+session_store: Optional[SessionStore] = None
+# ig_client를 만든 세션 설정의 지문 (다른 워커의 로그인 감지용)
+_session_fingerprint: Optional[str] = None
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+# username -> user_id 캐시 (user_id는 거의 바뀌지 않으므로 조회 API 호출 절약)
+_user_id_cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+# /api/story 호출 제한 (클라이언트별 토큰 버킷: 최대 5회 연속, 분당 5회 충전)
+STORY_RATE_BURST = 5
+STORY_RATE_PER_SEC = 5 / 60
+_story_buckets: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+# 진행 중인 스토리 조회 (username -> Task), 동시 요청 병합용
+_inflight_stories: dict = {}
+# 공유 ig_client 호출 직렬화용 (instagrapi Client는 동시 사용에 안전하지 않음)
+_ig_lock = asyncio.Lock()
+
+# API key (미설정 시 인증 불필요)
+API_KEY = os.environ.get("API_KEY", "")
 
 # Page authentication
 PAGE_PASSWORD = os.environ.get("PAGE_PASSWORD", "")
-auth_tokens: set = set()  # Valid session tokens
+PAGE_AUTH_MAX_AGE = 7 * 24 * 60 * 60  # 쿠키 유효 기간 (7일)
+# PAGE_AUTH_SECRET 미설정 시 생성되는 서명 키 파일 (모든 워커가 공유)
+PAGE_AUTH_SECRET_FILE = Path(__file__).parent / "data" / "sessions" / "page_auth.key"
+
+
+def _load_page_auth_key() -> bytes:
+    """
+    페이지 토큰 서명 키 로드
+
+    비밀번호와 무관한 난수 키를 사용하여 토큰이 유출되어도 비밀번호를 역산할 수 없게 함.
+    PAGE_AUTH_SECRET이 없으면 키 파일을 한 번 생성해 모든 워커가 같은 키를 사용함.
+    """
+    secret = os.environ.get("PAGE_AUTH_SECRET", "")
+    if secret:
+        return hashlib.sha256(secret.encode()).digest()
+
+    PAGE_AUTH_SECRET_FILE.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(str(PAGE_AUTH_SECRET_FILE), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # 다른 워커가 쓰는 중일 수 있으므로 키가 채워질 때까지 잠시 대기
+        for _ in range(50):
+            key = PAGE_AUTH_SECRET_FILE.read_bytes()
+            if len(key) == 32:
+                return key
+            time.sleep(0.1)
+        raise RuntimeError(f"페이지 인증 키 파일이 올바르지 않습니다: {PAGE_AUTH_SECRET_FILE}")
+
+    key = secrets.token_bytes(32)
+    try:
+        os.write(fd, key)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return key
+
+
+# 서명된 토큰을 사용하므로 여러 워커가 토큰 목록을 공유하지 않아도 검증 가능
+_PAGE_AUTH_KEY = _load_page_auth_key() if PAGE_PASSWORD else b""
 
 
 # Request/Response Models
@@ -59,6 +132,22 @@ class PageAuthResponse(BaseModel):
     message: str
 
 
+class AuthCheckResponse(BaseModel):
+    authenticated: bool
+    required: bool
+
+
+class MessageResponse(BaseModel):
+    success: bool
+    message: str
+
+
+class FavoriteResponse(BaseModel):
+    success: bool
+    username: str
+    favorite: bool
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -118,21 +207,86 @@ class ReorderTargetsRequest(BaseModel):
     usernames: List[str]  # 새로운 순서대로 정렬된 유저네임 리스트
 
 
-def try_login_with_session() -> bool:
-    """저장된 세션으로 로그인 시도"""
-    global ig_client, config
+def _sign_page_token(payload: str) -> str:
+    return hmac.new(_PAGE_AUTH_KEY, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def create_page_token() -> str:
+    """만료 시각이 포함된 서명 토큰 생성"""
+    payload = f"{int(time.time()) + PAGE_AUTH_MAX_AGE}.{secrets.token_urlsafe(16)}"
+    return f"{payload}.{_sign_page_token(payload)}"
 
-    session_file = Path(config.session_file)
-    if not session_file.exists():
+
+def is_valid_page_token(token: Optional[str]) -> bool:
+    """토큰 서명 및 만료 확인"""
+    if not token:
+        return False
+    payload, _, signature = token.rpartition(".")
+    if not payload or not hmac.compare_digest(signature, _sign_page_token(payload)):
         return False
+    expires_at, _, _ = payload.partition(".")
+    return expires_at.isdigit() and int(expires_at) > time.time()
+
+
+async def ig_call(func, *args, **kwargs):
+    """
+    공유 ig_client의 동기 메서드를 스레드풀에서 실행
+
+    Instagram 호출 동안에도 이벤트 루프가 다른 요청을 처리할 수 있도록 하고,
+    같은 워커 내 Instagram 호출은 순차 처리하여 rate limit 위험을 줄임
+    """
+    async with _ig_lock:
+        return await run_in_threadpool(func, *args, **kwargs)
+
 
+def _fingerprint(settings: dict) -> str:
+    """세션 설정 지문 (키 순서와 무관)"""
+    return hashlib.sha256(orjson.dumps(settings, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _set_client(client: Client, settings: dict) -> None:
+    """ig_client 교체 및 세션 지문 갱신"""
+    global ig_client, _session_fingerprint
+    ig_client = client
+    _session_fingerprint = _fingerprint(settings)
+
+
+def _reload_session_if_changed() -> None:
+    """
+    세션 저장소의 세션이 이 워커의 ig_client와 다르면 다시 불러옴
+
+    로그인/세션 업로드는 요청을 받은 워커에서만 처리되므로
+    나머지 워커는 저장소를 통해 새 세션을 받아옴 (검증은 저장한 워커가 이미 수행)
+    """
     try:
+        settings = session_store.get()
+    except Exception as e:
+        logger.warning(f"세션 저장소 조회 실패: {e}")
+        return
+    if settings is None or _fingerprint(settings) == _session_fingerprint:
+        return
+
+    client = Client()
+    client.set_settings(settings)
+    _set_client(client, settings)
+    logger.info("세션 저장소의 새 세션으로 Instagram 클라이언트 교체")
+
+
+def try_login_with_session() -> bool:
+    """저장된 세션으로 로그인 시도"""
+    global config
+
+    try:
+        settings = session_store.get()
+        if settings is None:
+            return False
+
         client = Client()
-        client.load_settings(session_file)
+        client.set_settings(settings)
         client.login(config.ig_username, config.ig_password)
         client.get_timeline_feed()  # 세션 유효성 확인
-        ig_client = client
-        logger.info("세션 파일로 Instagram 로그인 성공")
+        _set_client(client, settings)
+        logger.info("저장된 세션으로 Instagram 로그인 성공")
         return True
     except Exception as e:
         logger.warning(f"세션 로그인 실패: {e}")
@@ -142,7 +296,7 @@ def try_login_with_session() -> bool:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 시 실행"""
-    global config, ig_client
+    global config, ig_client, session_store
 
     logger.info("API 서버 초기화 중...")
 
@@ -154,6 +308,9 @@ async def lifespan(app: FastAPI):
         logger.error(f"설정 로드 실패: {e}")
         raise
 
+    # 세션 저장소 (REDIS_URL 설정 시 워커 간 세션 공유)
+    session_store = SessionStore(config.session_file, os.environ.get("REDIS_URL", ""))
+
     # 저장된 세션으로 로그인 시도
     try_login_with_session()
 
@@ -180,27 +337,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Static files
+# Static files (FileResponse 기반이라 가능하면 sendfile로 전송됨)
 static_dir = Path(__file__).parent / "static"
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+index_file = static_dir / "index.html"
+app.mount("/static", StaticFiles(directory=static_dir, html=True, check_dir=False), name="static")
 
 
 @app.get("/", include_in_schema=False)
 async def root():
     """웹 UI 제공"""
-    index_file = static_dir / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
+    if index_file.is_file():
+        return FileResponse(index_file, media_type="text/html")
     return {"message": "Instagram Story API", "docs": "/docs"}
 
 
-@app.get("/api/auth/check")
+@app.get("/api/auth/check", response_model=AuthCheckResponse)
 async def check_page_auth(auth_token: Optional[str] = Cookie(None)):
     """페이지 인증 상태 확인"""
     if not PAGE_PASSWORD:
         return {"authenticated": True, "required": False}
-    authenticated = auth_token in auth_tokens if auth_token else False
+    authenticated = is_valid_page_token(auth_token)
     return {"authenticated": authenticated, "required": True}
 
 
@@ -214,14 +370,13 @@ async def page_auth(request: PageAuthRequest, response: Response):
         raise HTTPException(status_code=401, detail="비밀번호가 틀렸습니다")
 
     # 새 토큰 생성
-    token = secrets.token_urlsafe(32)
-    auth_tokens.add(token)
+    token = create_page_token()
 
     # 쿠키 설정 (7일 유효)
     response.set_cookie(
         key="auth_token",
         value=token,
-        max_age=7 * 24 * 60 * 60,
+        max_age=PAGE_AUTH_MAX_AGE,
         httponly=True,
         samesite="lax"
     )
@@ -231,19 +386,50 @@ async def page_auth(request: PageAuthRequest, response: Response):
 
 def verify_api_key(api_key: str = Security(api_key_header)) -> bool:
     """API 키 검증 (선택사항)"""
-    expected_key = os.environ.get("API_KEY", "")
-    if not expected_key:
+    if not API_KEY:
         return True
-    if api_key != expected_key:
+    # 타이밍 공격 방지를 위해 상수 시간 비교
+    if not api_key or not hmac.compare_digest(api_key.encode(), API_KEY.encode()):
         raise HTTPException(status_code=401, detail="Invalid API Key")
     return True
 
 
+def limit_story_rate(request: Request, api_key: Optional[str] = Security(api_key_header)) -> bool:
+    """
+    /api/story 호출 빈도 제한 (API_KEY 설정 시 API 키, 아니면 클라이언트 IP 기준)
+
+    과도한 호출로 공유 Instagram 세션이 차단되는 것을 막기 위함.
+    API_KEY 미설정 시 헤더 값은 검증되지 않으므로 매번 다른 값을 보내 우회할 수 없도록 IP 사용
+    """
+    if API_KEY and api_key:
+        key = f"key:{api_key}"
+    else:
+        key = f"ip:{request.client.host if request.client else ''}"
+    now = time.monotonic()
+    tokens, last = _story_buckets.get(key, (STORY_RATE_BURST, now))
+    tokens = min(STORY_RATE_BURST, tokens + (now - last) * STORY_RATE_PER_SEC)
+
+    if tokens < 1:
+        _story_buckets[key] = (tokens, now)
+        retry_after = int((1 - tokens) / STORY_RATE_PER_SEC) + 1
+        raise HTTPException(
+            status_code=429,
+            detail="요청이 너무 많습니다. 잠시 후 다시 시도하세요.",
+            headers={
+                "Retry-After": str(retry_after),
+                "RateLimit-Limit": str(STORY_RATE_BURST),
+            }
+        )
+
+    _story_buckets[key] = (tokens - 1, now)
+    return True
+
+
 def verify_page_auth(auth_token: Optional[str] = Cookie(None)) -> bool:
     """페이지 인증 확인"""
     if not PAGE_PASSWORD:
         return True  # 비밀번호 미설정 시 인증 불필요
-    if not auth_token or auth_token not in auth_tokens:
+    if not is_valid_page_token(auth_token):
         raise HTTPException(status_code=401, detail="Page authentication required")
     return True
 
@@ -288,19 +474,10 @@ def save_targets(targets: List[dict]) -> None:
 
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
-    """서버 상태 확인"""
-    ig_logged_in = False
-
-    if ig_client:
-        try:
-            ig_client.get_timeline_feed()
-            ig_logged_in = True
-        except:
-            pass
-
+    """서버 상태 확인 (Instagram 호출 없이 즉시 응답, 진행 중인 조회를 기다리지 않음)"""
     return HealthResponse(
         status="ok",
-        instagram_logged_in=ig_logged_in,
+        instagram_logged_in=ig_client is not None,
         timestamp=datetime.now().isoformat()
     )
 
@@ -349,7 +526,7 @@ async def add_target(request: AddTargetRequest, _: bool = Depends(verify_page_au
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.delete("/api/targets/{username}")
+@app.delete("/api/targets/{username}", response_model=MessageResponse)
 async def delete_target(username: str, _: bool = Depends(verify_page_auth)):
     """팔로워 삭제"""
     username = username.strip().lower()
@@ -370,7 +547,7 @@ async def delete_target(username: str, _: bool = Depends(verify_page_auth)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.patch("/api/targets/{username}/favorite")
+@app.patch("/api/targets/{username}/favorite", response_model=FavoriteResponse)
 async def toggle_favorite(username: str, _: bool = Depends(verify_page_auth)):
     """즐겨찾기 토글"""
     username = username.strip().lower()
@@ -398,7 +575,7 @@ async def toggle_favorite(username: str, _: bool = Depends(verify_page_auth)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.put("/api/targets/reorder")
+@app.put("/api/targets/reorder", response_model=MessageResponse)
 async def reorder_targets(request: ReorderTargetsRequest, _: bool = Depends(verify_page_auth)):
     """순서 변경"""
     try:
@@ -421,7 +598,7 @@ async def reorder_targets(request: ReorderTargetsRequest, _: bool = Depends(veri
 @app.post("/api/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
     """Instagram 로그인 및 세션 생성"""
-    global ig_client, config
+    global config
 
     username = request.username.strip()
     password = request.password
@@ -435,21 +612,14 @@ async def login(request: LoginRequest):
         client.delay_range = [1, 3]
 
         logger.info(f"Instagram 로그인 시도: {username}")
-        client.login(username, password)
+        await run_in_threadpool(client.login, username, password)
 
         # 세션 저장
-        session_file = Path(config.session_file)
-        session_file.parent.mkdir(parents=True, exist_ok=True)
-        client.dump_settings(session_file)
-
-        # 파일 권한 설정
-        try:
-            os.chmod(session_file, 0o600)
-        except:
-            pass
+        settings = client.get_settings()
+        session_store.put(settings)
 
         # 글로벌 클라이언트 업데이트
-        ig_client = client
+        _set_client(client, settings)
 
         logger.info(f"Instagram 로그인 성공: {username}")
         return LoginResponse(success=True, message="로그인 성공!")
@@ -478,8 +648,7 @@ async def login(request: LoginRequest):
 @app.post("/api/login-with-cookies", response_model=LoginResponse)
 async def login_with_cookies(request: CookieLoginRequest):
     """웹 쿠키로 세션 생성"""
-    global ig_client, config
-    import uuid as uuid_module
+    global config
 
     sessionid = request.sessionid.strip()
     ds_user_id = request.ds_user_id.strip()
@@ -489,16 +658,18 @@ async def login_with_cookies(request: CookieLoginRequest):
         raise HTTPException(status_code=400, detail="sessionid와 ds_user_id는 필수입니다")
 
     try:
-        # 세션 데이터 구성
+        # 세션 데이터 구성 (UUID 7개 분량의 난수를 한 번에 생성)
+        raw = os.urandom(16 * 7)
+        ids = [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, len(raw), 16)]
         session_data = {
             "uuids": {
-                "phone_id": str(uuid_module.uuid4()),
-                "uuid": str(uuid_module.uuid4()),
-                "client_session_id": str(uuid_module.uuid4()),
-                "advertising_id": str(uuid_module.uuid4()),
-                "android_device_id": f"android-{uuid_module.uuid4().hex[:16]}",
-                "request_id": str(uuid_module.uuid4()),
-                "tray_session_id": str(uuid_module.uuid4()),
+                "phone_id": str(ids[0]),
+                "uuid": str(ids[1]),
+                "client_session_id": str(ids[2]),
+                "advertising_id": str(ids[3]),
+                "android_device_id": f"android-{ids[4].hex[:16]}",
+                "request_id": str(ids[5]),
+                "tray_session_id": str(ids[6]),
             },
             "mid": "",
             "ig_u_rur": "",
@@ -528,37 +699,29 @@ async def login_with_cookies(request: CookieLoginRequest):
             "user_agent": "Instagram 269.0.0.18.75 Android (31/12; 480dpi; 1080x2168; samsung; SM-A526B; a52q; qcom; ko_KR; 422022788)",
         }
 
-        # 세션 파일 저장
-        session_file = Path(config.session_file)
-        session_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(session_file, 'w') as f:
-            json.dump(session_data, f, indent=2)
-
-        try:
-            os.chmod(session_file, 0o600)
-        except:
-            pass
+        # 세션 저장
+        session_store.put(session_data)
 
         logger.info(f"쿠키로 세션 파일 생성됨: ds_user_id={ds_user_id}")
 
-        # 세션으로 로그인 시도
+        # 세션으로 로그인 시도 (파일을 다시 읽지 않고 메모리의 설정 사용)
         client = Client()
-        client.load_settings(session_file)
+        client.set_settings(session_data)
 
         # 세션 유효성 확인
         try:
-            client.get_timeline_feed()
-            ig_client = client
+            await run_in_threadpool(client.get_timeline_feed)
+            _set_client(client, session_data)
             logger.info("쿠키 세션으로 Instagram 로그인 성공")
             return LoginResponse(success=True, message="쿠키 로그인 성공!")
         except Exception as e:
             logger.warning(f"세션 검증 실패, 재로그인 시도: {e}")
             # 설정된 username/password로 재로그인 시도
             if config.ig_username and config.ig_password:
-                client.login(config.ig_username, config.ig_password)
-                client.dump_settings(session_file)
-                ig_client = client
+                await run_in_threadpool(client.login, config.ig_username, config.ig_password)
+                settings = client.get_settings()
+                session_store.put(settings)
+                _set_client(client, settings)
                 logger.info("재로그인으로 Instagram 로그인 성공")
                 return LoginResponse(success=True, message="세션 갱신 성공!")
             raise
@@ -571,7 +734,7 @@ async def login_with_cookies(request: CookieLoginRequest):
 @app.post("/api/upload-session", response_model=LoginResponse)
 async def upload_session(file: UploadFile = File(...)):
     """세션 파일 업로드로 로그인"""
-    global ig_client, config
+    global config
 
     if not file.filename.endswith('.json'):
         raise HTTPException(status_code=400, detail="JSON 파일만 업로드 가능합니다")
@@ -579,30 +742,20 @@ async def upload_session(file: UploadFile = File(...)):
     try:
         # 파일 내용 읽기
         content = await file.read()
-        session_data = json.loads(content.decode('utf-8'))
+        session_data = orjson.loads(content)
 
-        # 세션 파일 저장
-        session_file = Path(config.session_file)
-        session_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(session_file, 'w') as f:
-            json.dump(session_data, f)
-
-        # 파일 권한 설정
-        try:
-            os.chmod(session_file, 0o600)
-        except:
-            pass
+        # 세션 저장
+        session_store.put(session_data)
 
         logger.info(f"세션 파일 업로드됨: {file.filename}")
 
-        # 세션으로 로그인 시도
+        # 세션으로 로그인 시도 (파일을 다시 읽지 않고 메모리의 설정 사용)
         client = Client()
-        client.load_settings(session_file)
-        client.login(config.ig_username, config.ig_password)
-        client.get_timeline_feed()  # 세션 유효성 확인
+        client.set_settings(session_data)
+        await run_in_threadpool(client.login, config.ig_username, config.ig_password)
+        await run_in_threadpool(client.get_timeline_feed)  # 세션 유효성 확인
 
-        ig_client = client
+        _set_client(client, session_data)
         logger.info("업로드된 세션으로 Instagram 로그인 성공")
 
         return LoginResponse(success=True, message="세션 업로드 및 로그인 성공!")
@@ -617,9 +770,13 @@ async def upload_session(file: UploadFile = File(...)):
 @app.get("/api/story", response_model=DownloadResponse)
 async def get_stories(
     username: str = Query(..., description="Instagram 사용자명"),
-    _: bool = Depends(verify_api_key)
+    _: bool = Depends(verify_api_key),
+    __: bool = Depends(limit_story_rate)
 ):
     """특정 사용자의 스토리 URL을 조회합니다."""
+    # 다른 워커에서 로그인/세션 업로드가 있었으면 새 세션 사용
+    await run_in_threadpool(_reload_session_if_changed)
+
     if not ig_client:
         raise HTTPException(status_code=503, detail="Instagram에 로그인되어 있지 않습니다")
 
@@ -628,19 +785,57 @@ async def get_stories(
     if not username:
         raise HTTPException(status_code=400, detail="username은 필수입니다")
 
+    # 같은 유저에 대한 동시 요청은 진행 중인 조회 하나를 함께 기다림
+    task = _inflight_stories.get(username)
+    if task is None:
+        task = asyncio.ensure_future(fetch_stories(username))
+        _inflight_stories[username] = task
+        task.add_done_callback(lambda t: _inflight_stories.pop(username, None))
+
+    # 먼저 요청한 클라이언트가 연결을 끊어도 공유 조회는 취소되지 않도록 shield
+    return await asyncio.shield(task)
+
+
+def to_story_response(story) -> Optional[StoryResponse]:
+    """instagrapi Story를 응답 모델로 변환 (다운로드 URL이 없으면 None)"""
     try:
-        # 사용자 정보 조회
-        try:
-            user_info = ig_client.user_info_by_username_v1(username)
-        except Exception as e:
-            logger.error(f"사용자 조회 실패: {e}")
-            raise HTTPException(status_code=404, detail=f"사용자를 찾을 수 없습니다: {username}")
+        thumbnail = story.thumbnail_url
+        is_video = story.media_type == 2
+        url = story.video_url if is_video else thumbnail
+        if not url:
+            return None
+
+        # 모든 값을 instagrapi 모델에서 직접 만든 문자열이므로 검증 생략
+        return StoryResponse.model_construct(
+            story_id=str(story.pk),
+            type="video" if is_video else "image",
+            taken_at=story.taken_at.isoformat(),
+            download_url=str(url),
+            thumbnail_url=str(thumbnail) if thumbnail else None
+        )
+    except AttributeError as e:
+        logger.error(f"스토리 파싱 실패 (ID: {getattr(story, 'pk', None)}): {e}")
+        return None
 
-        user_id = user_info.pk
+
+async def fetch_stories(username: str) -> DownloadResponse:
+    """Instagram에서 스토리 조회 후 응답 생성"""
+    try:
+        # 사용자 정보 조회 (캐시 우선)
+        user_id = _user_id_cache.get(username)
+        if user_id is None:
+            try:
+                user_info = await ig_call(ig_client.user_info_by_username_v1, username)
+            except Exception as e:
+                logger.error(f"사용자 조회 실패: {e}")
+                raise HTTPException(status_code=404, detail=f"사용자를 찾을 수 없습니다: {username}")
+
+            user_id = user_info.pk
+            _user_id_cache[username] = user_id
 
         # 스토리 조회
         try:
-            stories = ig_client.user_stories(user_id)
+            stories = await ig_call(ig_client.user_stories, user_id)
         except Exception as e:
             logger.error(f"스토리 조회 실패: {e}")
             raise HTTPException(status_code=500, detail=f"스토리 조회 실패: {str(e)}")
@@ -655,32 +850,7 @@ async def get_stories(
             )
 
         # 스토리 URL 추출
-        story_responses = []
-        for story in stories:
-            try:
-                media_type = story.media_type
-
-                if media_type == 2:  # 비디오
-                    download_url = str(story.video_url) if story.video_url else None
-                else:  # 이미지
-                    download_url = str(story.thumbnail_url) if story.thumbnail_url else None
-
-                if not download_url:
-                    continue
-
-                thumbnail_url = str(story.thumbnail_url) if story.thumbnail_url else None
-
-                story_responses.append(StoryResponse(
-                    story_id=str(story.pk),
-                    type="video" if media_type == 2 else "image",
-                    taken_at=story.taken_at.isoformat(),
-                    download_url=download_url,
-                    thumbnail_url=thumbnail_url
-                ))
-
-            except Exception as e:
-                logger.error(f"스토리 파싱 실패 (ID: {story.pk}): {e}")
-                continue
+        story_responses = [r for r in map(to_story_response, stories) if r is not None]
 
         return DownloadResponse(
             success=True,
@@ -699,4 +869,14 @@ async def get_stories(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 워커 수는 WEB_CONCURRENCY로 지정 (기본: CPU 코어 * 2 + 1)
+    workers = int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    # uvloop(libuv 기반 이벤트 루프) + httptools 파서 사용 (uvicorn[standard])
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools"
+    )
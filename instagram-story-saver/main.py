@@ -4,14 +4,17 @@ Instagram Story Saver
 지정된 Instagram 유저의 스토리를 자동으로 감지하고 저장합니다.
 """
 import sys
+import time
+import asyncio
 import signal
 import argparse
 import random
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional
 
-from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.cron import CronTrigger
 from rich.console import Console
@@ -47,24 +50,31 @@ class InstagramStorySaver:
         self.downloader: Optional[StoryDownloader] = None
         self.notifier: Optional[TelegramNotifier] = None
         self.discord_notifier: Optional[DiscordNotifier] = None
+        self._notifier = None  # 활성화된 알림 서비스 (initialize에서 결정)
         self.cloud_storage: Optional[CloudStorage] = None
         self.database: Optional[Database] = None
         self.history: Optional[DownloadHistory] = None
-        self.scheduler: Optional[BlockingScheduler] = None
+        self.scheduler: Optional[AsyncIOScheduler] = None
         
         self._is_running = False
-        self._pending_stories: List[StoryItem] = []
+        self._last_cleanup = 0.0  # 마지막 기록 정리 시각 (monotonic)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutdown_event: Optional[asyncio.Event] = None
         self._setup_signal_handlers()
     
     def _setup_signal_handlers(self):
-        """종료 시그널 핸들러 설정"""
+        """종료 시그널 핸들러 설정 (이벤트 루프 시작 전/미지원 플랫폼용)"""
         signal.signal(signal.SIGINT, self._handle_shutdown)
         signal.signal(signal.SIGTERM, self._handle_shutdown)
     
-    def _handle_shutdown(self, signum, frame):
+    def _handle_shutdown(self, signum=None, frame=None):
         """종료 처리"""
         console.print("\n[yellow]종료 신호를 받았습니다. 정리 중...[/yellow]")
-        self.stop()
+        if self._loop is not None and self._loop.is_running():
+            # 이벤트 루프가 돌고 있으면 루프에서 종료하도록 이벤트만 설정
+            self._loop.call_soon_threadsafe(self._shutdown_event.set)
+        else:
+            self.stop()
     
     def initialize(self) -> bool:
         """초기화"""
@@ -157,7 +167,6 @@ class InstagramStorySaver:
             chunk_size=self.config.download_chunk_size,
             max_retries=self.config.download_max_retries,
             disk_check_interval_mb=self.config.download_disk_check_interval_mb,
-            queue_check_interval=self.config.download_queue_check_interval,
             max_completed_history=self.config.max_completed_history,
             user_agent=self.config.download_user_agent
         )
@@ -183,6 +192,7 @@ class InstagramStorySaver:
                     console.print("  ✓ Telegram 알림 준비 완료")
                 else:
                     console.print("  ⚠ Telegram 알림 비활성화됨")
+            self._notifier = self.discord_notifier or self.notifier
         
         # 9. 클라우드 저장소 초기화
         if self.config.cloud_enabled:
@@ -199,10 +209,6 @@ class InstagramStorySaver:
         console.print("\n[green]✓ 초기화 완료![/green]\n")
         return True
     
-    def _get_notifier(self):
-        """현재 활성화된 알림 서비스 반환"""
-        return self.discord_notifier or self.notifier
-
     def _register_callbacks(self):
         """이벤트 콜백 등록"""
         # 새 스토리 감지 시
@@ -214,11 +220,11 @@ class InstagramStorySaver:
                 self.database.add_story_detection(story)
 
             # 알림
-            notifier = self._get_notifier()
+            notifier = self._notifier
             if notifier and self.config.notify_story_detected:
                 notifier.notify_new_story(story)
 
-            # 다운로드 시작
+            # 다운로드 시작 (다운로더 대기열이 가득 차면 자리가 날 때까지 대기)
             self.downloader.download(story)
 
         self.monitor.on('on_new_story', on_new_story)
@@ -246,7 +252,7 @@ class InstagramStorySaver:
                 cloud_path = self.cloud_storage.upload_story(task)
 
             # 알림 (클라우드 경로 포함)
-            notifier = self._get_notifier()
+            notifier = self._notifier
             if notifier and self.config.notify_download_complete:
                 notifier.notify_download_complete(task, cloud_path=cloud_path)
 
@@ -269,7 +275,7 @@ class InstagramStorySaver:
                 self.database.add_download(record)
 
             # 알림
-            notifier = self._get_notifier()
+            notifier = self._notifier
             if notifier and self.config.notify_download_failed:
                 notifier.notify_download_failed(task)
 
@@ -333,12 +339,15 @@ class InstagramStorySaver:
             )
             console.print(status_line)
 
-            # 다운로드 기록 정리
-            self.history.cleanup()
+            # 다운로드 기록 정리 (매 체크마다가 아니라 보관 기간의 1/10마다)
+            now = time.monotonic()
+            if now - self._last_cleanup > max(60, self.config.duplicate_check_hours * 360):
+                self.history.cleanup()
+                self._last_cleanup = now
 
         except Exception as e:
             self.logger.error(f"스토리 체크 에러: {e}")
-            notifier = self._get_notifier()
+            notifier = self._notifier
             if notifier and self.config.notify_errors:
                 notifier.notify_error(str(e))
         finally:
@@ -349,7 +358,7 @@ class InstagramStorySaver:
     def _send_daily_summary(self):
         """일일 요약 전송"""
         try:
-            notifier = self._get_notifier()
+            notifier = self._notifier
             if not notifier or not self.config.notify_daily_summary:
                 return
 
@@ -398,12 +407,38 @@ class InstagramStorySaver:
         self._is_running = True
 
         # 시작 알림
-        notifier = self._get_notifier()
+        notifier = self._notifier
         if notifier:
             notifier.notify_startup(len(self.config.targets))
 
+        # 이벤트 루프에서 실행 (종료 신호 대기)
+        try:
+            asyncio.run(self._run())
+        except (KeyboardInterrupt, SystemExit):
+            self.stop()
+
+    async def _run(self):
+        """스케줄러를 실행하고 종료 신호까지 대기"""
+        self._loop = asyncio.get_running_loop()
+        self._shutdown_event = asyncio.Event()
+
+        # 루프에서 시그널 처리 (Windows 등 미지원 시 signal.signal 핸들러 유지)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._handle_shutdown)
+            except (NotImplementedError, RuntimeError):
+                pass
+
         # 스케줄러 설정
-        self.scheduler = BlockingScheduler()
+        # 작업은 한 스레드에서 순서대로 실행하고, 늦어진 실행은 한 번으로 합침
+        self.scheduler = AsyncIOScheduler(
+            executors={'default': ThreadPoolExecutor(max_workers=1)},
+            job_defaults={
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': max(30, self.config.check_interval_min // 2)
+            }
+        )
 
         # 스토리 체크 작업 등록 (랜덤 주기)
         self._schedule_next_check()
@@ -430,14 +465,13 @@ class InstagramStorySaver:
             border_style="green"
         ))
         
-        # 즉시 첫 체크 실행
-        self._check_stories()
-        
-        # 스케줄러 시작
-        try:
-            self.scheduler.start()
-        except (KeyboardInterrupt, SystemExit):
-            pass
+        # 즉시 첫 체크 실행 (블로킹 작업이므로 스레드에서)
+        await self._loop.run_in_executor(None, self._check_stories)
+
+        # 스케줄러 시작 후 종료 신호 대기
+        self.scheduler.start()
+        await self._shutdown_event.wait()
+        self.stop()
     
     def stop(self):
         """모니터링 중지"""
@@ -457,7 +491,7 @@ class InstagramStorySaver:
             self.downloader.stop_all()
 
         # 종료 알림
-        notifier = self._get_notifier()
+        notifier = self._notifier
         if notifier and self.monitor and self.downloader:
             stats = {
                 **self.monitor.get_stats(),
@@ -470,6 +504,9 @@ class InstagramStorySaver:
         if self.database:
             self.database.close()
 
+        if self.history:
+            self.history.close()
+
         console.print("[green]정상 종료되었습니다.[/green]")
     
     def show_status(self):
@@ -556,15 +593,20 @@ def main():
         return
 
     # Telegram 테스트 모드
+    # (로그인/DB/다운로더 초기화 없이 설정과 알림 서비스만 준비)
     if args.test_telegram:
-        if saver.initialize():
-            if saver.notifier:
-                if saver.notifier.test_connection():
+        saver.config = load_config(args.config)
+        telegram_notifier = create_notifier(saver.config)
+        if telegram_notifier:
+            try:
+                if telegram_notifier.test_connection():
                     console.print("[green]Telegram 테스트 성공![/green]")
                 else:
                     console.print("[red]Telegram 테스트 실패[/red]")
-            else:
-                console.print("[yellow]Telegram이 설정되지 않았습니다.[/yellow]")
+            finally:
+                telegram_notifier.stop()
+        else:
+            console.print("[yellow]Telegram이 설정되지 않았습니다.[/yellow]")
         return
     
     if args.test_login:
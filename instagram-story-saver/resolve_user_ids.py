@@ -7,29 +7,99 @@ Rate limit을 피하기 위해 천천히 조회합니다.
 
 사용법:
     python resolve_user_ids.py                    # 기본 설정으로 실행
-    python resolve_user_ids.py --delay 10         # 딜레이 10초
+    python resolve_user_ids.py --delay 10         # 평균 10초에 1명
     python resolve_user_ids.py --batch 5          # 5명마다 긴 휴식
-    python resolve_user_ids.py --resume           # 중단된 곳부터 재개
+
+중단되더라도 조회 결과는 저널(targets.resolved.jsonl)에 남아 있어 다시 실행하면 이어서 진행합니다.
 """
 import os
 import sys
-import json
 import time
 import argparse
 from pathlib import Path
+from typing import List
 from datetime import datetime
 
 # 프로젝트 루트 추가
 sys.path.insert(0, str(Path(__file__).parent))
 
+import orjson
 from dotenv import load_dotenv
 
+from src.utils.resolve_journal import (
+    ResolveJournal, journal_path_for, replay_journal, set_user_id
+)
+
+# rate limit 감지 시 재시도 횟수 (대기: 5초부터 2배씩, 최대 300초)
+MAX_RETRIES = 5
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+        if self._tokens < 1:
+            time.sleep((1 - self._tokens) / self.rate)
+            self._last = time.monotonic()
+            self._tokens = 1.0
+        self._tokens -= 1
+
+
+class ProgressWriter:
+    """진행 상황 출력을 모아서 flush_every줄마다 한 번에 쓰기"""
+
+    def __init__(self, flush_every: int = 10):
+        self.flush_every = flush_every
+        self._buf: List[str] = []
+
+    def __call__(self, msg: str):
+        self._buf.append(msg + "\n")
+        if len(self._buf) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._buf:
+            sys.stdout.write("".join(self._buf))
+            sys.stdout.flush()
+            self._buf.clear()
+
+
+def _resolve_via_web(client, uname: str) -> str:
+    """web_profile_info 엔드포인트로 user_id 조회
+
+    user_info_by_username_v1보다 rate limit 카운터가 느슨합니다.
+    """
+    from instagrapi.exceptions import ClientNotFoundError, UserNotFound
+
+    try:
+        result = client.private_request(
+            "users/web_profile_info/",
+            params={"username": uname}
+        )
+    except ClientNotFoundError:
+        raise UserNotFound(username=uname)
+    user = (result.get("data") or {}).get("user")
+    if not user:
+        raise UserNotFound(username=uname)
+    return user["id"]
+
+
 def resolve_user_ids(
     targets_file: str = "config/targets.json",
-    delay: float = 15.0,
+    delay: float = 6.5,
     batch_size: int = 10,
-    batch_delay: float = 30.0,
-    resume: bool = False
+    batch_delay: float = 30.0
 ):
     """User ID 조회 및 저장"""
 
@@ -57,22 +127,35 @@ def resolve_user_ids(
         print(f"오류: {targets_file} 파일이 없습니다.")
         return False
 
-    with open(targets_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = orjson.loads(targets_path.read_bytes())
 
     targets = data.get('targets', [])
     print(f"총 {len(targets)}명의 타겟")
 
+    # username -> targets 인덱스 (조회 결과를 상수 시간에 반영)
+    idx_by_name = {
+        (t.get('username') if isinstance(t, dict) else t): i
+        for i, t in enumerate(targets)
+    }
+
+    # 조회 결과 저널 (한 줄에 한 명씩 append, 마지막에 targets.json으로 통합)
+    # 이전 실행이 중단되어 남은 저널은 항상 반영 (targets.json에는 아직 없는 결과)
+    journal_path = journal_path_for(targets_path)
+    if journal_path.exists():
+        recovered = replay_journal(journal_path, targets, idx_by_name)
+        print(f"저널에서 {recovered}명 복구: {journal_path}")
+
     # user_id가 없는 타겟 찾기
     needs_resolve = []
-    for i, target in enumerate(targets):
-        if isinstance(target, str):
-            needs_resolve.append((i, target, None))
-        elif isinstance(target, dict):
-            if not target.get('user_id'):
-                needs_resolve.append((i, target.get('username'), target))
+    for uname, i in idx_by_name.items():
+        target = targets[i]
+        if isinstance(target, str) or not target.get('user_id'):
+            needs_resolve.append(uname)
 
     if not needs_resolve:
+        if journal_path.exists():
+            save_targets(targets_path, targets)
+            journal_path.unlink()
         print("모든 타겟의 user_id가 이미 있습니다.")
         return True
 
@@ -83,31 +166,38 @@ def resolve_user_ids(
     # Instagram 로그인
     try:
         from instagrapi import Client
-        from instagrapi.exceptions import ClientError, UserNotFound
+        from instagrapi.exceptions import (
+            ClientError, ClientThrottledError, LoginRequired, UserNotFound
+        )
     except ImportError:
         print("오류: instagrapi 패키지가 필요합니다.")
         print("  pip install instagrapi")
         return False
 
     client = Client()
-
-    # 세션 파일로 로그인 시도
     session_path = Path(session_file)
-    if session_path.exists():
-        try:
-            client.load_settings(session_path)
-            client.login(username, password)
-            print(f"세션 파일로 로그인 성공: {client.username}")
-        except Exception as e:
-            print(f"세션 로그인 실패, 새로 로그인: {e}")
-            client.login(username, password)
-    else:
+
+    def login():
+        """새로 로그인 후 세션 저장"""
         client.login(username, password)
+        session_path.parent.mkdir(parents=True, exist_ok=True)
+        session_path.write_bytes(orjson.dumps(
+            client.get_settings(),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ))
         print(f"로그인 성공: {client.username}")
 
-    # 세션 저장
-    session_path.parent.mkdir(parents=True, exist_ok=True)
-    client.dump_settings(session_path)
+    # 세션 파일이 있으면 로그인 API 호출 없이 재사용 (만료 시 첫 조회에서 재로그인)
+    session_loaded = False
+    if session_path.exists():
+        try:
+            client.set_settings(orjson.loads(session_path.read_bytes()))
+            session_loaded = True
+            print(f"세션 파일 로드: {session_path}")
+        except Exception as e:
+            print(f"세션 파일 로드 실패, 새로 로그인: {e}")
+    if not session_loaded:
+        login()
 
     print()
     print("=" * 50)
@@ -118,72 +208,78 @@ def resolve_user_ids(
 
     resolved = 0
     failed = 0
+    total = len(needs_resolve)
+    progress = ProgressWriter()
+
+    journal = ResolveJournal(journal_path)
+
+    def record(idx: int, uname: str, user_id) -> None:
+        nonlocal resolved
+        set_user_id(targets, idx_by_name[uname], uname, user_id)
+        journal.record(uname, user_id)
+        resolved += 1
+        progress(f"[{idx+1}/{total}] {uname} -> {user_id}")
+
+    bucket = TokenBucket(rate=1 / delay, burst=3)
 
     try:
-        for idx, (i, uname, existing) in enumerate(needs_resolve):
-            try:
-                # user_id 조회
-                user_info = client.user_info_by_username_v1(uname)
-                user_id = user_info.pk
-
-                # targets 업데이트
-                if existing:
-                    existing['user_id'] = user_id
-                    targets[i] = existing
-                else:
-                    targets[i] = {
-                        'username': uname,
-                        'user_id': user_id
-                    }
-
-                resolved += 1
-                print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> {user_id}")
-
-            except UserNotFound:
-                failed += 1
-                print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 사용자 없음")
-            except ClientError as e:
-                if "feedback_required" in str(e):
-                    print(f"\nRate limit 감지! 30초 대기 후 재시도...")
-                    time.sleep(30)
-                    try:
-                        user_info = client.user_info_by_username_v1(uname)
-                        user_id = user_info.pk
-                        if existing:
-                            existing['user_id'] = user_id
-                            targets[i] = existing
-                        else:
-                            targets[i] = {'username': uname, 'user_id': user_id}
-                        resolved += 1
-                        print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> {user_id}")
-                    except Exception as e2:
+        for idx, uname in enumerate(needs_resolve):
+            for attempt in range(MAX_RETRIES + 1):
+                bucket.acquire()
+                try:
+                    # user_id 조회
+                    record(idx, uname, _resolve_via_web(client, uname))
+                    break
+
+                except UserNotFound:
+                    failed += 1
+                    progress(f"[{idx+1}/{total}] {uname} -> 사용자 없음")
+                    break
+                except LoginRequired:
+                    if not session_loaded:
                         failed += 1
-                        print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 실패: {e2}")
-                else:
+                        progress(f"[{idx+1}/{total}] {uname} -> 실패: 로그인 필요")
+                        break
+                    # 저장된 세션이 만료됨 → 한 번만 재로그인 후 재시도
+                    progress("세션 만료, 새로 로그인...")
+                    progress.flush()
+                    session_loaded = False
+                    login()
+                    continue
+                except ClientError as e:
+                    rate_limited = (
+                        isinstance(e, ClientThrottledError)
+                        or "feedback_required" in str(e)
+                    )
+                    if rate_limited and attempt < MAX_RETRIES:
+                        wait = min(300, 5 * 2 ** attempt)
+                        progress(f"\nRate limit 감지! {wait}초 대기 후 재시도...")
+                        progress.flush()
+                        time.sleep(wait)
+                        continue
                     failed += 1
-                    print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 실패: {e}")
-            except Exception as e:
-                failed += 1
-                print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 실패: {e}")
-
-            # 진행 상황 저장 (10명마다)
-            if (idx + 1) % 10 == 0:
-                save_targets(targets_path, targets)
-                print(f"  (진행 상황 저장됨)")
-
-            # 딜레이
-            if idx + 1 < len(needs_resolve):
-                if (idx + 1) % batch_size == 0:
-                    print(f"  배치 완료, {batch_delay}초 휴식...")
-                    time.sleep(batch_delay)
-                else:
-                    time.sleep(delay)
+                    progress(f"[{idx+1}/{total}] {uname} -> 실패: {e}")
+                    break
+                except Exception as e:
+                    failed += 1
+                    progress(f"[{idx+1}/{total}] {uname} -> 실패: {e}")
+                    break
+
+            # 배치 휴식
+            if idx + 1 < total and (idx + 1) % batch_size == 0:
+                progress(f"  배치 완료, {batch_delay}초 휴식...")
+                progress.flush()
+                time.sleep(batch_delay)
 
     except KeyboardInterrupt:
-        print("\n\n중단됨. 진행 상황 저장 중...")
+        progress("\n\n중단됨. 진행 상황 저장 중...")
+    finally:
+        progress.flush()
+        journal.close()
 
-    # 최종 저장
+    # 최종 저장 (저널 내용이 targets.json에 반영되었으므로 저널 삭제)
     save_targets(targets_path, targets)
+    journal_path.unlink(missing_ok=True)
 
     print()
     print("=" * 50)
@@ -200,17 +296,28 @@ def save_targets(path: Path, targets: list):
         'targets': targets,
         'last_updated': datetime.now().isoformat()
     }
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    # 임시 파일에 쓴 뒤 교체 (중단되어도 기존 targets.json이 손상되지 않음)
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="User ID 조회 스크립트")
     parser.add_argument('--targets', default='config/targets.json', help='targets.json 경로')
-    parser.add_argument('--delay', type=float, default=15.0, help='조회 간 딜레이 (초)')
+    parser.add_argument('--delay', type=float, default=6.5, help='조회 간 평균 간격 (초)')
     parser.add_argument('--batch', type=int, default=10, help='배치 크기')
     parser.add_argument('--batch-delay', type=float, default=30.0, help='배치 간 딜레이 (초)')
-    parser.add_argument('--resume', action='store_true', help='중단된 곳부터 재개')
+    parser.add_argument('--resume', action='store_true', help='(호환용) 저널이 있으면 항상 이어서 진행')
 
     args = parser.parse_args()
 
@@ -218,6 +325,5 @@ if __name__ == "__main__":
         targets_file=args.targets,
         delay=args.delay,
         batch_size=args.batch,
-        batch_delay=args.batch_delay,
-        resume=args.resume
+        batch_delay=args.batch_delay
     )
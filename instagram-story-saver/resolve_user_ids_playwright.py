@@ -9,68 +9,186 @@ API rate limit을 우회할 수 있습니다.
     python resolve_user_ids_playwright.py
     python resolve_user_ids_playwright.py --delay 3
     python resolve_user_ids_playwright.py --headed  # 브라우저 창 보이기
+    python resolve_user_ids_playwright.py --contexts 2  # 동시 브라우저 컨텍스트 수
 """
 import json
-import time
 import re
+import asyncio
 import argparse
 from pathlib import Path
 from datetime import datetime
 
 
-def get_user_id_playwright(page, username: str) -> int | None:
+# 프로필 조회에 필요 없는 리소스 (전송량 절감)
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+
+
+# HTML에서 user_id 추출: (앵커, 앵커 위치에서 매칭할 패턴, 검사할 최대 길이), 우선순위 순서
+# bytes.find로 앵커를 먼저 찾고 그 주변의 짧은 구간에만 정규식을 적용
+_UID_RULES = (
+    (b'profilePage_', re.compile(rb'profilePage_(\d+)'), 48),
+    (b'"user_id"', re.compile(rb'"user_id":\s*"?(\d+)"?'), 64),
+    (b'"owner"', re.compile(rb'"owner":\s*\{[^}]*"id":\s*"(\d+)"'), 1024),
+)
+
+
+def _extract_user_id(html: str) -> int | None:
+    """HTML에서 우선순위가 가장 높은 패턴의 user_id 반환"""
+    buf = html.encode('ascii', 'ignore')
+    for anchor, pattern, window in _UID_RULES:
+        idx = buf.find(anchor)
+        while idx >= 0:
+            match = pattern.match(buf, idx, idx + window)
+            if match:
+                return int(match.group(1))
+            idx = buf.find(anchor, idx + 1)
+    return None
+
+
+async def _block_heavy_resources(route):
+    """이미지/미디어/폰트/스타일시트 요청 차단"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def get_user_id_playwright(page, username: str) -> int | None:
     """Playwright로 Instagram 프로필에서 user_id 추출"""
+    # 페이지가 호출하는 web_profile_info XHR 응답에서 바로 user_id를 가져옴
+    profile_future = asyncio.get_running_loop().create_future()
+
+    async def on_response(response):
+        if 'web_profile_info' not in response.url or profile_future.done():
+            return
+        try:
+            data = await response.json()
+        except Exception:
+            return
+        user_id = ((data.get('data') or {}).get('user') or {}).get('id')
+        if user_id and not profile_future.done():
+            profile_future.set_result(int(user_id))
+
+    page.on('response', on_response)
     try:
         url = f"https://www.instagram.com/{username}/"
-        page.goto(url, timeout=30000)
-        page.wait_for_load_state('networkidle', timeout=15000)
-
-        html = page.content()
+        await page.goto(url, wait_until='commit', timeout=30000)
 
         # 로그인 페이지 체크
         if 'login' in page.url.lower() and username not in page.url.lower():
-            print(f"    로그인 페이지로 리다이렉트됨")
+            print(f"    {username}: 로그인 페이지로 리다이렉트됨")
             return None
 
-        # 방법 1: profilePage_숫자 패턴
-        match = re.search(r'profilePage_(\d+)', html)
-        if match:
-            return int(match.group(1))
+        try:
+            return await asyncio.wait_for(profile_future, timeout=8)
+        except asyncio.TimeoutError:
+            pass
 
-        # 방법 2: "user_id":"숫자" 패턴
-        match = re.search(r'"user_id":\s*"?(\d+)"?', html)
-        if match:
-            return int(match.group(1))
+        # XHR이 없으면 렌더링된 HTML에서 추출 (프로필 메타 태그까지만 대기)
+        await page.wait_for_selector('meta[property="og:title"]', state='attached', timeout=8000)
 
-        # 방법 3: owner id 패턴
-        match = re.search(r'"owner":\s*\{[^}]*"id":\s*"(\d+)"', html)
-        if match:
-            return int(match.group(1))
+        html = await page.content()
 
-        return None
+        return _extract_user_id(html)
 
     except Exception as e:
         error_msg = str(e)
         if "404" in error_msg or "not found" in error_msg.lower():
-            print(f"    사용자 없음")
+            print(f"    {username}: 사용자 없음")
         elif "timeout" in error_msg.lower():
-            print(f"    타임아웃")
+            print(f"    {username}: 타임아웃")
         else:
-            print(f"    오류: {error_msg[:50]}")
+            print(f"    {username}: 오류: {error_msg[:50]}")
         return None
+    finally:
+        page.remove_listener('response', on_response)
+
+
+async def _resolve_all(
+    needs_resolve: list,
+    targets: list,
+    targets_path: Path,
+    delay: float,
+    num_contexts: int,
+    headed: bool,
+    stats: dict
+):
+    """브라우저 하나에 컨텍스트 여러 개를 열고 대기열의 username을 나눠 조회"""
+    from playwright.async_api import async_playwright
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in needs_resolve:
+        queue.put_nowait(item)
+
+    total = len(needs_resolve)
+    done = 0
+
+    async def worker(context):
+        nonlocal done
+        page = await context.new_page()
+        await page.route('**/*', _block_heavy_resources)
+
+        while True:
+            try:
+                i, uname, existing = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            user_id = await get_user_id_playwright(page, uname)
+
+            done += 1
+            if user_id:
+                # targets 업데이트
+                if existing:
+                    existing['user_id'] = user_id
+                    targets[i] = existing
+                else:
+                    targets[i] = {
+                        'username': uname,
+                        'user_id': user_id
+                    }
+
+                stats['resolved'] += 1
+                print(f"[{done}/{total}] {uname} -> {user_id}")
+            else:
+                stats['failed_users'].append(uname)
+                print(f"[{done}/{total}] {uname} -> 실패")
+
+            # 진행 상황 저장 (20명마다)
+            if done % 20 == 0:
+                save_targets(targets_path, targets)
+                print(f"  (진행 상황 저장됨)")
+
+            # 컨텍스트별 딜레이
+            if not queue.empty():
+                await asyncio.sleep(delay)
+
+    async with async_playwright() as p:
+        # 브라우저 실행 (컨텍스트는 브라우저보다 훨씬 가볍고 서로 격리됨)
+        browser = await p.chromium.launch(headless=not headed)
+        try:
+            contexts = [
+                await browser.new_context(
+                    viewport={'width': 1280, 'height': 720},
+                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                )
+                for _ in range(max(1, min(num_contexts, total)))
+            ]
+            await asyncio.gather(*(worker(ctx) for ctx in contexts))
+        finally:
+            await browser.close()
 
 
 def resolve_user_ids_playwright(
     targets_file: str = "config/targets.json",
     delay: float = 2.0,
-    batch_size: int = 20,
-    batch_delay: float = 10.0,
+    num_contexts: int = 4,
     headed: bool = False
 ):
     """Playwright로 User ID 조회 및 저장"""
 
     try:
-        from playwright.sync_api import sync_playwright
+        import playwright.async_api  # noqa: F401
     except ImportError:
         print("오류: playwright 패키지가 필요합니다.")
         print("  pip install playwright")
@@ -102,7 +220,7 @@ def resolve_user_ids_playwright(
         return True
 
     print(f"user_id 조회 필요: {len(needs_resolve)}명")
-    print(f"예상 시간: 약 {len(needs_resolve) * (delay + 3) / 60:.1f}분")
+    print(f"예상 시간: 약 {len(needs_resolve) * (delay + 3) / max(1, num_contexts) / 60:.1f}분")
     print()
     print("=" * 50)
     print("Playwright 브라우저로 user_id 조회 시작")
@@ -111,72 +229,24 @@ def resolve_user_ids_playwright(
     print("=" * 50)
     print()
 
-    resolved = 0
-    failed = 0
-    failed_users = []
-
-    with sync_playwright() as p:
-        # 브라우저 실행
-        browser = p.chromium.launch(headless=not headed)
-        context = browser.new_context(
-            viewport={'width': 1280, 'height': 720},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        page = context.new_page()
+    stats = {'resolved': 0, 'failed_users': []}
 
-        try:
-            for idx, (i, uname, existing) in enumerate(needs_resolve):
-                try:
-                    user_id = get_user_id_playwright(page, uname)
-
-                    if user_id:
-                        # targets 업데이트
-                        if existing:
-                            existing['user_id'] = user_id
-                            targets[i] = existing
-                        else:
-                            targets[i] = {
-                                'username': uname,
-                                'user_id': user_id
-                            }
-
-                        resolved += 1
-                        print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> {user_id}")
-                    else:
-                        failed += 1
-                        failed_users.append(uname)
-                        print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 실패")
-
-                except Exception as e:
-                    failed += 1
-                    failed_users.append(uname)
-                    print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 오류: {e}")
-
-                # 진행 상황 저장 (20명마다)
-                if (idx + 1) % 20 == 0:
-                    save_targets(targets_path, targets)
-                    print(f"  (진행 상황 저장됨)")
-
-                # 딜레이
-                if idx + 1 < len(needs_resolve):
-                    if (idx + 1) % batch_size == 0:
-                        print(f"  배치 완료, {batch_delay}초 휴식...")
-                        time.sleep(batch_delay)
-                    else:
-                        time.sleep(delay)
-
-        except KeyboardInterrupt:
-            print("\n\n중단됨. 진행 상황 저장 중...")
-
-        finally:
-            browser.close()
+    try:
+        asyncio.run(_resolve_all(
+            needs_resolve, targets, targets_path, delay, num_contexts, headed, stats
+        ))
+    except KeyboardInterrupt:
+        print("\n\n중단됨. 진행 상황 저장 중...")
 
     # 최종 저장
     save_targets(targets_path, targets)
 
+    resolved = stats['resolved']
+    failed_users = stats['failed_users']
+
     print()
     print("=" * 50)
-    print(f"완료: {resolved}명 성공, {failed}명 실패")
+    print(f"완료: {resolved}명 성공, {len(failed_users)}명 실패")
     print(f"저장됨: {targets_path}")
 
     if failed_users:
@@ -205,9 +275,8 @@ def save_targets(path: Path, targets: list):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Playwright로 User ID 조회")
     parser.add_argument('--targets', default='config/targets.json', help='targets.json 경로')
-    parser.add_argument('--delay', type=float, default=2.0, help='조회 간 딜레이 (초)')
-    parser.add_argument('--batch', type=int, default=20, help='배치 크기')
-    parser.add_argument('--batch-delay', type=float, default=10.0, help='배치 간 딜레이 (초)')
+    parser.add_argument('--delay', type=float, default=2.0, help='컨텍스트별 조회 간 딜레이 (초)')
+    parser.add_argument('--contexts', type=int, default=4, help='동시 브라우저 컨텍스트 수')
     parser.add_argument('--headed', action='store_true', help='브라우저 창 표시')
 
     args = parser.parse_args()
@@ -215,7 +284,6 @@ if __name__ == "__main__":
     resolve_user_ids_playwright(
         targets_file=args.targets,
         delay=args.delay,
-        batch_size=args.batch,
-        batch_delay=args.batch_delay,
+        num_contexts=args.contexts,
         headed=args.headed
     )
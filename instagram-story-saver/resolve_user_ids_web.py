@@ -4,75 +4,193 @@
 
 Instagram API를 사용하지 않고 웹사이트에서 user_id를 가져옵니다.
 Rate limit 걱정 없이 사용 가능합니다.
+여러 요청을 동시에 보내되(--concurrency), 전체 요청 속도는 토큰 버킷으로 제한합니다(--delay).
 
 사용법:
     python resolve_user_ids_web.py
     python resolve_user_ids_web.py --delay 3
+    python resolve_user_ids_web.py --concurrency 4
+
+중단되더라도 조회 결과는 저널(targets.resolved.jsonl)에 남아 있어 다시 실행하면 이어서 진행합니다.
 """
-import json
+import os
+import sys
 import time
-import re
+import asyncio
 import argparse
 from pathlib import Path
 from datetime import datetime
-import urllib.request
-import urllib.parse
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+import orjson
+
+from src.utils.resolve_journal import (
+    ResolveJournal, journal_path_for, replay_journal, set_user_id
+)
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+PROFILE_INFO_URL = "https://www.instagram.com/api/v1/users/web_profile_info/"
+
+# 일시적 오류 재시도 (연결 실패는 transport가, 429/503은 백오프 후 재요청)
+MAX_RETRIES = 3
+RETRY_STATUS_CODES = frozenset({429, 503})
+RETRY_BACKOFF = 1.0  # 초, 재시도마다 2배
 
 # User-Agent 설정 (브라우저처럼 보이게)
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.5',
+    'X-IG-App-ID': '936619743392459',
+    'X-Requested-With': 'XMLHttpRequest',
+    'Accept': 'application/json',
 }
 
 
-def get_user_id_from_instagram(username: str) -> int | None:
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷 (asyncio용)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._last = time.monotonic()
+                self._tokens = 1.0
+            self._tokens -= 1
+
+
+class _AsyncBodyReader:
+    """httpx 스트리밍 응답 본문을 ijson이 읽을 수 있는 async read() 객체로 감싸기"""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+
+    async def read(self, n: int = -1) -> bytes:
+        # ijson은 read(0)으로 bytes/str 여부를 확인하므로 데이터를 소비하지 않음
+        if n == 0:
+            return b''
+        # 빈 청크는 ijson이 EOF로 해석하므로 건너뜀
+        async for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b''
+
+
+async def _read_user_id(response: httpx.Response):
+    """응답 JSON에서 data.user.id만 추출 (ijson이 있으면 전체 트리를 만들지 않고 스트리밍)"""
+    if ijson is None:
+        j = orjson.loads(await response.aread())
+        return ((j.get('data') or {}).get('user') or {}).get('id')
+
+    async for prefix, event, value in ijson.parse_async(_AsyncBodyReader(response)):
+        if prefix == 'data.user.id' and event in ('string', 'number'):
+            return value
+    return None
+
+
+async def get_user_id_from_instagram(client: httpx.AsyncClient, username: str) -> int | None:
     """Instagram web_profile_info API로 user_id 조회 (로그인 불필요)"""
-    try:
-        url = f"https://www.instagram.com/api/v1/users/web_profile_info/?username={username}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'X-IG-App-ID': '936619743392459',
-            'X-Requested-With': 'XMLHttpRequest',
-            'Accept': 'application/json',
-        }
-        req = urllib.request.Request(url, headers=headers)
-
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = response.read()
-            text = data.decode('utf-8', errors='ignore')
-
-        import json
-        j = json.loads(text)
-        user_id = j.get('data', {}).get('user', {}).get('id')
-
-        if user_id:
-            return int(user_id)
-        return None
-
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            print(f"    사용자 없음 (404)")
-        elif e.code == 429:
-            print(f"    Rate limit (429) - 잠시 후 재시도...")
-        else:
-            print(f"    HTTP 오류: {e.code}")
-        return None
-    except Exception as e:
-        print(f"    조회 실패: {e}")
-        return None
-
-
-def get_user_id(username: str) -> int | None:
-    """Instagram 프로필에서 user_id 조회"""
-    return get_user_id_from_instagram(username)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with client.stream('GET', PROFILE_INFO_URL, params={'username': username}) as response:
+                response.raise_for_status()
+                user_id = await _read_user_id(response)
+
+            if user_id:
+                return int(user_id)
+            return None
+
+        except httpx.HTTPStatusError as e:
+            code = e.response.status_code
+            if code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+                wait = RETRY_BACKOFF * 2 ** attempt
+                print(f"    {username}: HTTP {code} - {wait:.0f}초 후 재시도...")
+                await asyncio.sleep(wait)
+                continue
+            if code == 404:
+                print(f"    {username}: 사용자 없음 (404)")
+            elif code == 429:
+                print(f"    {username}: Rate limit (429)")
+            else:
+                print(f"    {username}: HTTP 오류: {code}")
+            return None
+        except Exception as e:
+            print(f"    {username}: 조회 실패: {e}")
+            return None
+    return None
+
+
+async def _resolve_all(
+    needs_resolve: list,
+    targets: list,
+    journal,
+    delay: float,
+    concurrency: int,
+    stats: dict
+):
+    """needs_resolve를 동시에 조회하고 결과를 targets에 반영"""
+    bucket = TokenBucket(rate=1 / delay, burst=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    total = len(needs_resolve)
+    done = 0
+
+    # 연결 풀 재사용 + HTTP/2 멀티플렉싱, 연결 실패는 transport에서 재시도
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=MAX_RETRIES,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=50)
+    )
+    async with httpx.AsyncClient(
+        transport=transport,
+        headers=HEADERS,
+        timeout=15
+    ) as client:
+
+        async def resolve_one(i: int, uname: str):
+            nonlocal done
+            async with semaphore:
+                await bucket.acquire()
+                user_id = await get_user_id_from_instagram(client, uname)
+
+            done += 1
+            if user_id:
+                # targets 업데이트 + 저널 기록 (targets.json은 마지막에 한 번만 저장)
+                set_user_id(targets, i, uname, user_id)
+                journal.record(uname, user_id)
+
+                stats['resolved'] += 1
+                print(f"[{done}/{total}] {uname} -> {user_id}")
+            else:
+                stats['failed_users'].append(uname)
+                print(f"[{done}/{total}] {uname} -> 실패")
+
+        await asyncio.gather(*(
+            resolve_one(i, uname)
+            for i, uname in needs_resolve
+        ))
 
 
 def resolve_user_ids_web(
     targets_file: str = "config/targets.json",
     delay: float = 2.0,
-    batch_size: int = 20,
-    batch_delay: float = 10.0
+    concurrency: int = 8
 ):
     """웹 스크래핑으로 User ID 조회 및 저장"""
 
@@ -81,22 +199,34 @@ def resolve_user_ids_web(
         print(f"오류: {targets_file} 파일이 없습니다.")
         return False
 
-    with open(targets_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = orjson.loads(targets_path.read_bytes())
 
     targets = data.get('targets', [])
     print(f"총 {len(targets)}명의 타겟")
 
+    # username -> targets 인덱스
+    idx_by_name = {
+        (t.get('username') if isinstance(t, dict) else t): i
+        for i, t in enumerate(targets)
+    }
+
+    # 이전 실행이 중단되어 남은 저널은 항상 반영 (targets.json에는 아직 없는 결과)
+    journal_path = journal_path_for(targets_path)
+    if journal_path.exists():
+        recovered = replay_journal(journal_path, targets, idx_by_name)
+        print(f"저널에서 {recovered}명 복구: {journal_path}")
+
     # user_id가 없는 타겟 찾기
     needs_resolve = []
-    for i, target in enumerate(targets):
-        if isinstance(target, str):
-            needs_resolve.append((i, target, None))
-        elif isinstance(target, dict):
-            if not target.get('user_id'):
-                needs_resolve.append((i, target.get('username'), target))
+    for uname, i in idx_by_name.items():
+        target = targets[i]
+        if isinstance(target, str) or not target.get('user_id'):
+            needs_resolve.append((i, uname))
 
     if not needs_resolve:
+        if journal_path.exists():
+            save_targets(targets_path, targets)
+            journal_path.unlink()
         print("모든 타겟의 user_id가 이미 있습니다.")
         return True
 
@@ -110,60 +240,26 @@ def resolve_user_ids_web(
     print("=" * 50)
     print()
 
-    resolved = 0
-    failed = 0
-    failed_users = []
+    stats = {'resolved': 0, 'failed_users': []}
 
     try:
-        for idx, (i, uname, existing) in enumerate(needs_resolve):
-            try:
-                user_id = get_user_id(uname)
-
-                if user_id:
-                    # targets 업데이트
-                    if existing:
-                        existing['user_id'] = user_id
-                        targets[i] = existing
-                    else:
-                        targets[i] = {
-                            'username': uname,
-                            'user_id': user_id
-                        }
-
-                    resolved += 1
-                    print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> {user_id}")
-                else:
-                    failed += 1
-                    failed_users.append(uname)
-                    print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 실패")
-
-            except Exception as e:
-                failed += 1
-                failed_users.append(uname)
-                print(f"[{idx+1}/{len(needs_resolve)}] {uname} -> 오류: {e}")
-
-            # 진행 상황 저장 (20명마다)
-            if (idx + 1) % 20 == 0:
-                save_targets(targets_path, targets)
-                print(f"  (진행 상황 저장됨)")
-
-            # 딜레이
-            if idx + 1 < len(needs_resolve):
-                if (idx + 1) % batch_size == 0:
-                    print(f"  배치 완료, {batch_delay}초 휴식...")
-                    time.sleep(batch_delay)
-                else:
-                    time.sleep(delay)
-
+        with ResolveJournal(journal_path) as journal:
+            asyncio.run(_resolve_all(
+                needs_resolve, targets, journal, delay, concurrency, stats
+            ))
     except KeyboardInterrupt:
         print("\n\n중단됨. 진행 상황 저장 중...")
 
-    # 최종 저장
+    # 최종 저장 (저널 내용이 targets.json에 반영되었으므로 저널 삭제)
     save_targets(targets_path, targets)
+    journal_path.unlink(missing_ok=True)
+
+    resolved = stats['resolved']
+    failed_users = stats['failed_users']
 
     print()
     print("=" * 50)
-    print(f"완료: {resolved}명 성공, {failed}명 실패")
+    print(f"완료: {resolved}명 성공, {len(failed_users)}명 실패")
     print(f"저장됨: {targets_path}")
 
     if failed_users:
@@ -180,27 +276,33 @@ def resolve_user_ids_web(
 
 
 def save_targets(path: Path, targets: list):
-    """targets.json 저장"""
+    """targets.json 저장 (임시 파일에 쓴 뒤 교체하여 중단 시에도 기존 파일 보존)"""
     data = {
         'targets': targets,
         'last_updated': datetime.now().isoformat()
     }
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="웹 스크래핑으로 User ID 조회")
     parser.add_argument('--targets', default='config/targets.json', help='targets.json 경로')
-    parser.add_argument('--delay', type=float, default=2.0, help='조회 간 딜레이 (초)')
-    parser.add_argument('--batch', type=int, default=20, help='배치 크기')
-    parser.add_argument('--batch-delay', type=float, default=10.0, help='배치 간 딜레이 (초)')
+    parser.add_argument('--delay', type=float, default=2.0, help='요청 간 평균 간격 (초)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수')
 
     args = parser.parse_args()
 
     resolve_user_ids_web(
         targets_file=args.targets,
         delay=args.delay,
-        batch_size=args.batch,
-        batch_delay=args.batch_delay
+        concurrency=args.concurrency
     )
@@ -11,6 +11,8 @@ import stat
 import time
 from pathlib import Path
 from typing import Optional
+
+import orjson
 from instagrapi import Client
 from instagrapi.exceptions import (
     LoginRequired,
@@ -105,7 +107,7 @@ class InstagramAuth:
             logger.info("저장된 세션으로 로그인 시도 중...")
             self._check_session_file_permissions()
             
-            self.client.load_settings(self.session_file)
+            self.client.set_settings(orjson.loads(self.session_file.read_bytes()))
             self.client.login(self.username, self.password)
             
             self.client.get_timeline_feed()
@@ -171,7 +173,10 @@ class InstagramAuth:
     def _save_session(self):
         """세션 저장"""
         self.session_file.parent.mkdir(parents=True, exist_ok=True)
-        self.client.dump_settings(self.session_file)
+        self.session_file.write_bytes(orjson.dumps(
+            self.client.get_settings(),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ))
         
         try:
             os.chmod(self.session_file, stat.S_IRUSR | stat.S_IWUSR)
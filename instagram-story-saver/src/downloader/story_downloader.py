@@ -5,16 +5,26 @@ Instagram 스토리 다운로더
 """
 import os
 import re
+import queue
 import time
 import shutil
-import requests
+import string
 import threading
 from pathlib import Path
-from typing import Dict, Optional, Callable, List
+from typing import Dict, Optional, Callable, List, Set
 from dataclasses import dataclass
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx HTTP/2 지원, httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 from src.utils.logger import get_logger
 from src.monitor.story_monitor import StoryItem, DownloadHistory
 
@@ -111,6 +121,9 @@ class StoryDownloader:
         'Chrome/120.0.0.0 Safari/537.36'
     )
 
+    # 임시 파일 열기 플래그 (Windows에서는 텍스트 모드 변환 방지)
+    _OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
     def __init__(
         self,
         output_dir: str = "data/stories",
@@ -121,17 +134,21 @@ class StoryDownloader:
         history: Optional[DownloadHistory] = None,
         timeout_connect: int = 10,
         timeout_read: int = 60,
-        chunk_size: int = 8192,
+        chunk_size: int = 1048576,
         max_retries: int = 3,
         disk_check_interval_mb: int = 10,
-        queue_check_interval: float = 1.0,
         max_completed_history: int = 1000,
-        user_agent: str = ""
+        user_agent: str = "",
+        max_pending: Optional[int] = None,
+        enqueue_timeout: float = 30.0
     ):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         self.filename_format = filename_format
+        # 파일명 템플릿은 한 번만 파싱 (literal, field, format_spec, conversion)
+        self._fmt_parts = list(string.Formatter().parse(filename_format))
+        self._fmt_fields = {field for _, field, _, _ in self._fmt_parts if field}
         self.max_concurrent = max_concurrent
         self.min_disk_space_mb = min_disk_space_mb
         self.save_thumbnails = save_thumbnails
@@ -141,15 +158,30 @@ class StoryDownloader:
         self.chunk_size = chunk_size
         self.max_retries = max_retries
         self.disk_check_interval_mb = disk_check_interval_mb
-        self.queue_check_interval = queue_check_interval
+        # 디스크 공간 측정은 누적 다운로드 disk_check_interval_mb마다만 하고,
+        # 그 사이에는 마지막 측정값에서 이후 쓴 양을 뺀 추정치로 판단
+        self._disk_check_bytes = disk_check_interval_mb * 1024 * 1024
+        self._last_free_bytes: Optional[int] = None  # 마지막 측정 여유 공간 (None이면 미측정)
+        self._bytes_since_check = 0  # 마지막 측정 이후 쓴 양
+        self._disk_lock = threading.Lock()
         self.max_completed_history = max_completed_history
         
         self.active_downloads: Dict[str, DownloadTask] = {}
         self.completed_downloads: List[DownloadTask] = []
-        self._pending_queue: List[StoryItem] = []  # 대기열
-        self._queue_lock = threading.Lock()  # 대기열 전용 락
+        # 대기열 (크기 제한, 가득 차면 download() 호출자가 enqueue_timeout초까지 대기)
+        if max_pending is None:
+            max_pending = max_concurrent * 2
+        self._pending_queue: queue.Queue = queue.Queue(maxsize=max_pending)  # None은 종료 신호
+        self.enqueue_timeout = enqueue_timeout
+        self._pending_ids: Set[str] = set()  # 대기열 중복 체크용
+        self._queue_lock = threading.Lock()  # _pending_ids 전용 락
+        # 동시 다운로드 슬롯 (_start_download에서 획득, _download_file 종료 시 반환)
+        self._slots = threading.Semaphore(max_concurrent)
         
-        self._executor = ThreadPoolExecutor(max_workers=max_concurrent)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent,
+            thread_name_prefix="StoryDownload"
+        )
         self._lock = threading.Lock()
         
         # 대기열 처리 스레드
@@ -167,13 +199,23 @@ class StoryDownloader:
             'on_download_failed': []
         }
         
-        # requests 세션 (연결 재사용)
-        self._session = requests.Session()
-        self._session.headers.update({
-            'User-Agent': user_agent if user_agent else self.DEFAULT_USER_AGENT,
-            'Accept': '*/*',
-            'Accept-Language': 'en-US,en;q=0.9',
-        })
+        # httpx 클라이언트 (모든 다운로드 스레드가 공유, 연결 재사용)
+        # HTTP/2를 쓸 수 있으면 CDN 호스트당 연결 하나에 여러 다운로드를 다중화
+        pool_size = max(max_concurrent * 2, 10)
+        self._client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size
+            ),
+            headers={
+                'User-Agent': user_agent if user_agent else self.DEFAULT_USER_AGENT,
+                'Accept': '*/*',
+                'Accept-Language': 'en-US,en;q=0.9',
+            }
+        )
+        self._timeout = httpx.Timeout(timeout_read, connect=timeout_connect)
     
     def on(self, event: str, callback: Callable):
         """이벤트 콜백 등록"""
@@ -199,31 +241,56 @@ class StoryDownloader:
                 logger.info(f"⏭️ 이미 다운로드 중: {story.username}")
                 return self.active_downloads[story_id]
 
-            # 최대 동시 다운로드 수 확인
-            if len(self.active_downloads) >= self.max_concurrent:
-                # 대기열에 추가
+        # 최대 동시 다운로드 수 확인 (빈 슬롯이 없으면 대기열에 추가)
+        if not self._slots.acquire(blocking=False):
+            with self._queue_lock:
+                # 중복 체크
+                if story_id in self._pending_ids:
+                    logger.info(f"⏭️ 이미 대기열에 있음: {story.username}")
+                    return None
+                self._pending_ids.add(story_id)
+
+            # 대기열이 가득 차면 자리가 날 때까지 호출자(모니터)를 대기시킴
+            try:
+                self._pending_queue.put(story, timeout=self.enqueue_timeout)
+            except queue.Full:
                 with self._queue_lock:
-                    # 중복 체크
-                    if not any(s.story_id == story_id for s in self._pending_queue):
-                        self._pending_queue.append(story)
-                        logger.info(f"📋 대기열 추가: {story.username} (대기: {len(self._pending_queue)}개)")
-                    else:
-                        logger.info(f"⏭️ 이미 대기열에 있음: {story.username}")
+                    self._pending_ids.discard(story_id)
+                # 기록에 남지 않았으므로 다음 체크에서 다시 감지됨
+                logger.warning(f"⚠️ 대기열 포화, 다음 체크에서 재시도: {story.username}")
                 return None
+            logger.info(f"📋 대기열 추가: {story.username} (대기: {self._pending_queue.qsize()}개)")
+            return None
 
         logger.info(f"🚀 다운로드 시작: {story.username}")
         return self._start_download(story)
     
     def _start_download(self, story: StoryItem) -> Optional[DownloadTask]:
-        """실제 다운로드 시작"""
+        """실제 다운로드 시작 (호출 전에 _slots를 획득한 상태여야 함)"""
+        try:
+            task = self._prepare_download(story)
+            if task is not None:
+                # 백그라운드에서 다운로드 시작
+                self._executor.submit(self._download_file, task)
+            else:
+                self._slots.release()
+            return task
+        except BaseException:
+            # 작업을 넘기지 못했으면 슬롯 반환
+            with self._lock:
+                self.active_downloads.pop(story.story_id, None)
+            self._slots.release()
+            raise
+
+    def _prepare_download(self, story: StoryItem) -> Optional[DownloadTask]:
+        """다운로드 태스크 생성 및 활성 목록 등록"""
         story_id = story.story_id
-        logger.info(f"📥 _start_download() 호출됨: {story.username} (story_id: {story_id})")
+        logger.info(f"📥 _prepare_download() 호출됨: {story.username} (story_id: {story_id})")
 
         # 디스크 공간 확인
-        if not check_disk_space(self.output_dir, self.min_disk_space_mb):
+        if not self._verify_disk_space(0, self.min_disk_space_mb):
             logger.error("❌ 디스크 공간 부족")
             return None
-        logger.info(f"✅ 디스크 공간 확인 완료")
         
         # URL 확인
         media_url = story.media_url
@@ -243,42 +310,40 @@ class StoryDownloader:
         with self._lock:
             self.active_downloads[story_id] = task
         
-        # 백그라운드에서 다운로드 시작
-        self._executor.submit(self._download_file, task)
-        
         return task
     
     def _process_queue(self):
-        """대기열 처리 워커"""
-        while self._queue_worker_running:
-            time.sleep(self.queue_check_interval)
-            
-            with self._lock:
-                active_count = len(self.active_downloads)
-            
-            if active_count >= self.max_concurrent:
-                continue
-            
+        """대기열 처리 워커 (빈 슬롯과 대기 항목이 생길 때까지 블로킹)"""
+        while True:
+            self._slots.acquire()
+            if not self._queue_worker_running:
+                break
+
+            # 대기열에서 다음 항목 가져오기
+            story = self._pending_queue.get()
+            if story is None:
+                break
             with self._queue_lock:
-                if not self._pending_queue:
-                    continue
-                
-                # 대기열에서 다음 항목 가져오기
-                story = self._pending_queue.pop(0)
-            
+                self._pending_ids.discard(story.story_id)
+
             # 다운로드 시작
             logger.info(f"📋 대기열에서 시작: {story.username}")
-            self._start_download(story)
+            try:
+                self._start_download(story)
+            except Exception as e:
+                logger.error(f"대기열 다운로드 시작 실패: {story.username} - {e}")
     
     def _generate_output_path(self, story: StoryItem) -> Path:
         """출력 파일 경로 생성"""
-        # 파일명 생성
-        filename = self.filename_format.format(
-            username=self._sanitize_filename(story.username),
-            display_name=self._sanitize_filename(story.display_name),
-            story_id=story.story_id
-        )
-        filename = story.taken_at.strftime(filename)
+        # 파일명 생성 (템플릿에 쓰인 필드만 계산)
+        values = {}
+        if 'username' in self._fmt_fields:
+            values['username'] = self._sanitize_filename(story.username)
+        if 'display_name' in self._fmt_fields:
+            values['display_name'] = self._sanitize_filename(story.display_name)
+        if 'story_id' in self._fmt_fields:
+            values['story_id'] = story.story_id
+        filename = story.taken_at.strftime(self._render(values))
         
         # 확장자 추가
         filename = f"{filename}.{story.file_extension}"
@@ -289,6 +354,20 @@ class StoryDownloader:
         
         return user_dir / filename
     
+    def _render(self, values: Dict[str, str]) -> str:
+        """미리 파싱한 filename_format에 값 채우기"""
+        out = []
+        for literal, field, spec, conversion in self._fmt_parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion == 'r':
+                    value = repr(value)
+                elif conversion == 'a':
+                    value = ascii(value)
+                out.append(format(value, spec) if spec else str(value))
+        return ''.join(out)
+
     def _sanitize_filename(self, name: str) -> str:
         """파일명에 사용할 수 없는 문자 제거"""
         if not name:
@@ -333,7 +412,7 @@ class StoryDownloader:
 
             # 다운로드
             logger.info(f"   📥 파일 다운로드 중...")
-            self._download_with_retry(media_url, task.output_path)
+            task.file_size = self._download_with_retry(media_url, task.output_path)
             logger.info(f"   ✅ 파일 다운로드 완료: {task.output_path}")
             
             # 썸네일 저장 (비디오의 경우)
@@ -348,9 +427,6 @@ class StoryDownloader:
             task.status = "completed"
             task.ended_at = datetime.now()
             
-            if task.output_path.exists():
-                task.file_size = task.output_path.stat().st_size
-            
             # 기록에 추가
             if self.history:
                 self.history.mark_downloaded(story.story_id)
@@ -387,14 +463,15 @@ class StoryDownloader:
                 # 완료 기록 크기 제한 (메모리 누적 방지)
                 if len(self.completed_downloads) > self.max_completed_history:
                     self.completed_downloads = self.completed_downloads[-self.max_completed_history:]
+            self._slots.release()
     
     def _download_with_retry(
         self,
         url: str,
         output_path: Path,
         max_retries: Optional[int] = None
-    ):
-        """재시도 로직이 포함된 다운로드"""
+    ) -> int:
+        """재시도 로직이 포함된 다운로드 (저장한 바이트 수 반환)"""
         if max_retries is None:
             max_retries = self.max_retries
             
@@ -403,40 +480,39 @@ class StoryDownloader:
         
         for attempt in range(max_retries):
             try:
-                response = self._session.get(
-                    url,
-                    stream=True,
-                    timeout=(self.timeout_connect, self.timeout_read)
-                )
-                response.raise_for_status()
-                
-                with open(temp_path, 'wb') as f:
-                    last_check_size = 0
-                    check_interval = self.disk_check_interval_mb * 1024 * 1024
+                with self._client.stream('GET', url, timeout=self._timeout) as response:
+                    response.raise_for_status()
                     
-                    for chunk in response.iter_content(chunk_size=self.chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            
-                            # 디스크 공간 체크
-                            current_size = f.tell()
-                            if current_size - last_check_size >= check_interval:
-                                if not check_disk_space(self.output_dir, 50):
+                    # 청크가 크므로 파이썬 버퍼 없이 fd에 바로 쓰기
+                    fd = os.open(str(temp_path), self._OPEN_FLAGS, 0o644)
+                    bytes_written = 0
+                    try:
+                        # 순차 쓰기임을 커널에 알림 (지원하는 플랫폼에서만)
+                        if hasattr(os, 'posix_fadvise'):
+                            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                        for chunk in response.iter_bytes(chunk_size=self.chunk_size):
+                            if chunk:
+                                self._write_all(fd, chunk)
+                                bytes_written += len(chunk)
+                                
+                                # 디스크 공간 체크
+                                if not self._verify_disk_space(len(chunk), 50):
                                     raise DiskSpaceError("다운로드 중 디스크 공간 부족")
-                                last_check_size = current_size
+                    finally:
+                        os.close(fd)
                 
                 # 완료 후 이름 변경
                 temp_path.rename(output_path)
-                return
+                return bytes_written
                 
             except DiskSpaceError:
                 # 임시 파일 정리 후 예외 전파
                 self._cleanup_temp_file(temp_path)
                 raise
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 last_error = DownloadError("타임아웃")
                 logger.warning(f"다운로드 타임아웃, 재시도 {attempt + 1}/{max_retries}")
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPError as e:
                 last_error = DownloadError(f"요청 오류: {e}")
                 logger.warning(f"다운로드 오류, 재시도 {attempt + 1}/{max_retries}: {e}")
             except Exception as e:
@@ -451,6 +527,48 @@ class StoryDownloader:
         self._cleanup_temp_file(temp_path)
         raise last_error or DownloadError("다운로드 실패")
     
+    @staticmethod
+    def _write_all(fd: int, data: bytes):
+        """os.write가 일부만 쓴 경우 나머지를 이어서 쓰기"""
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    
+    def _verify_disk_space(self, nbytes: int, min_space_mb: int) -> bool:
+        """
+        여유 공간이 min_space_mb 이상인지 확인
+
+        추정치(마지막 측정값 - 이후 쓴 양)가 충분하면 측정을 생략하고,
+        측정 후 disk_check_interval_mb 이상 썼거나 추정치가 부족할 때만 다시 측정.
+        호출마다 기준(min_space_mb)을 따로 적용하므로 다운로드 전 확인이 약해지지 않음.
+        """
+        min_bytes = min_space_mb * 1024 * 1024
+        with self._disk_lock:
+            self._bytes_since_check += nbytes
+            written = self._bytes_since_check
+            if (
+                self._last_free_bytes is not None
+                and written < self._disk_check_bytes
+                and self._last_free_bytes - written >= min_bytes
+            ):
+                return True
+        
+        try:
+            free = shutil.disk_usage(self.output_dir).free
+        except OSError as e:
+            logger.warning(f"디스크 공간 확인 실패: {e}")
+            return True
+        
+        with self._disk_lock:
+            self._last_free_bytes = free
+            # 측정 중 다른 스레드가 쓴 양은 다음 측정까지 유지
+            self._bytes_since_check -= written
+        
+        if free < min_bytes:
+            logger.warning(f"디스크 여유 공간 부족: {free / (1024 * 1024):.0f}MB / 필요: {min_space_mb}MB")
+            return False
+        return True
+    
     def _cleanup_temp_file(self, temp_path: Path):
         """임시 파일 정리"""
         try:
@@ -461,14 +579,24 @@ class StoryDownloader:
     
     def stop_all(self):
         """모든 다운로드 중지"""
-        # 대기열 워커 정지
+        # 대기열 워커 정지 (슬롯 대기와 대기열 대기를 모두 깨움)
         self._queue_worker_running = False
+        self._slots.release()
+        try:
+            self._pending_queue.put_nowait(None)
+        except queue.Full:
+            pass  # 대기열에 항목이 있으면 워커는 슬롯 대기에서 깨어나 종료함
         if self._queue_worker.is_alive():
             self._queue_worker.join(timeout=3)
         
         # 대기열 비우기
         with self._queue_lock:
-            self._pending_queue.clear()
+            while True:
+                try:
+                    self._pending_queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._pending_ids.clear()
         
         # ThreadPoolExecutor 정지
         import sys
@@ -477,7 +605,7 @@ class StoryDownloader:
         else:
             self._executor.shutdown(wait=True)
         
-        self._session.close()
+        self._client.close()
     
     def get_active_downloads(self) -> List[DownloadTask]:
         """활성 다운로드 목록"""
@@ -492,7 +620,7 @@ class StoryDownloader:
             total_size = sum(t.file_size for t in completed)
             
             with self._queue_lock:
-                pending_count = len(self._pending_queue)
+                pending_count = len(self._pending_ids)
             
             return {
                 'active_downloads': len(self.active_downloads),
@@ -3,9 +3,10 @@ Instagram 스토리 모니터링 서비스
 """
 import time
 import json
+import sqlite3
 import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from instagrapi import Client
@@ -105,106 +106,102 @@ class MonitorState:
 
 
 class DownloadHistory:
-    """다운로드 기록 관리 (중복 방지)"""
+    """다운로드 기록 관리 (중복 방지)
+
+    SQLite WITHOUT ROWID 테이블에 story_id별 다운로드 시각을 저장합니다.
+    같은 이름의 .json 파일(이전 버전의 기록)이 있으면 처음 한 번 가져옵니다.
+    """
     
     def __init__(self, history_file: str, expire_hours: int = 24):
         self.history_file = Path(history_file)
+        self.legacy_file = self.history_file.with_suffix('.json')
         self.expire_hours = expire_hours
-        self._history: Dict[str, datetime] = {}
         self._lock = threading.Lock()
-        self._load()
+        
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.history_file),
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS history (
+                story_id TEXT PRIMARY KEY,
+                ts REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_history_ts ON history(ts)')
+        self._import_legacy()
+    
+    def _cutoff(self) -> float:
+        """만료 기준 시각 (epoch 초)"""
+        return time.time() - self.expire_hours * 3600
     
-    def _load(self):
-        """기록 파일 로드"""
-        if not self.history_file.exists():
+    def _import_legacy(self):
+        """기존 JSON 기록 파일 가져오기 (DB가 비어 있을 때 한 번)"""
+        if self.legacy_file == self.history_file or not self.legacy_file.exists():
+            return
+        if self._conn.execute('SELECT 1 FROM history LIMIT 1').fetchone():
             return
         
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            now = datetime.now()
-            cutoff = now - timedelta(hours=self.expire_hours)
-            
-            for story_id, timestamp_str in data.get('downloads', {}).items():
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                    if timestamp > cutoff:
-                        self._history[story_id] = timestamp
-                except (ValueError, TypeError):
-                    # 잘못된 날짜 형식 무시
-                    pass
-                    
         except (json.JSONDecodeError, IOError) as e:
             logger.warning(f"다운로드 기록 로드 실패: {e}")
-    
-    def _save(self):
-        """기록 파일 저장 (원자적 쓰기)"""
-        try:
-            self.history_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {
-                'downloads': {
-                    story_id: ts.isoformat()
-                    for story_id, ts in self._history.items()
-                },
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            # 원자적 쓰기: 임시 파일에 쓴 후 이름 변경
-            temp_file = self.history_file.with_suffix('.tmp')
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            # Windows 호환: rename() 대신 replace() 사용 (대상 파일 존재 시에도 동작)
-            temp_file.replace(self.history_file)
-                
-        except Exception as e:
-            logger.warning(f"다운로드 기록 저장 실패: {e}")
-            # 임시 파일 정리
-            temp_file = self.history_file.with_suffix('.tmp')
-            if temp_file.exists():
-                try:
-                    temp_file.unlink()
-                except OSError:
-                    pass
+            return
+        
+        cutoff = self._cutoff()
+        rows = []
+        for story_id, timestamp_str in data.get('downloads', {}).items():
+            try:
+                ts = datetime.fromisoformat(timestamp_str).timestamp()
+            except (ValueError, TypeError):
+                # 잘못된 날짜 형식 무시
+                continue
+            if ts > cutoff:
+                rows.append((story_id, ts))
+        
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany('INSERT OR IGNORE INTO history VALUES (?, ?)', rows)
+            self._conn.execute('COMMIT')
+        logger.info(f"기존 다운로드 기록 {len(rows)}개 가져옴: {self.legacy_file}")
     
     def is_downloaded(self, story_id: str) -> bool:
-        """이미 다운로드했는지 확인"""
+        """이미 다운로드했는지 확인 (만료된 기록은 제외)"""
         with self._lock:
-            if story_id not in self._history:
-                return False
-            
-            # 만료 확인
-            download_time = self._history[story_id]
-            if datetime.now() - download_time > timedelta(hours=self.expire_hours):
-                del self._history[story_id]
-                return False
-            
-            return True
+            row = self._conn.execute(
+                'SELECT 1 FROM history WHERE story_id = ? AND ts >= ? LIMIT 1',
+                (story_id, self._cutoff())
+            ).fetchone()
+        return row is not None
     
     def mark_downloaded(self, story_id: str):
         """다운로드 완료 표시"""
         with self._lock:
-            self._history[story_id] = datetime.now()
-            self._save()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO history (story_id, ts) VALUES (?, ?)',
+                (story_id, time.time())
+            )
     
     def cleanup(self):
         """만료된 기록 정리"""
         with self._lock:
-            now = datetime.now()
-            cutoff = now - timedelta(hours=self.expire_hours)
-            
-            expired = [
-                story_id for story_id, ts in self._history.items()
-                if ts < cutoff
-            ]
-            
-            for story_id in expired:
-                del self._history[story_id]
-            
-            if expired:
-                self._save()
-                logger.debug(f"만료된 기록 {len(expired)}개 정리됨")
+            deleted = self._conn.execute(
+                'DELETE FROM history WHERE ts < ?',
+                (self._cutoff(),)
+            ).rowcount
+        
+        if deleted > 0:
+            logger.debug(f"만료된 기록 {deleted}개 정리됨")
+    
+    def close(self):
+        """연결 종료"""
+        with self._lock:
+            self._conn.close()
 
 
 class StoryMonitor:
@@ -219,6 +216,9 @@ class StoryMonitor:
         '240p': 240,
     }
     
+    # 타겟 우선순위 정렬 순서
+    PRIORITY_ORDER = {'high': 0, 'normal': 1, 'low': 2}
+    
     def __init__(
         self,
         client: Client,
@@ -236,7 +236,15 @@ class StoryMonitor:
         user_id_resolve_batch: int = 10
     ):
         self.client = client
-        self.targets = targets
+        # 타겟 목록은 실행 중 바뀌지 않으므로 한 번만 정규화 (user_id만 제자리 갱신)
+        self.targets: Tuple[TargetUser, ...] = tuple(targets)
+        self._targets_by_priority: Tuple[TargetUser, ...] = tuple(sorted(
+            self.targets,
+            key=lambda t: self.PRIORITY_ORDER.get(t.priority, 1)
+        ))
+        self._targets_by_username: Dict[str, TargetUser] = {
+            t.username.lower(): t for t in self.targets
+        }
         self.history = history
         self.batch_size = batch_size
         self.batch_delay = batch_delay
@@ -351,12 +359,8 @@ class StoryMonitor:
         
         new_stories = []
         
-        # 우선순위별 정렬
-        priority_order = {'high': 0, 'normal': 1, 'low': 2}
-        sorted_targets = sorted(
-            self.targets,
-            key=lambda t: priority_order.get(t.priority, 1)
-        )
+        # 우선순위별 정렬 (초기화 시 계산)
+        sorted_targets = self._targets_by_priority
         
         # 배치로 나누어 체크
         for i in range(0, len(sorted_targets), self.batch_size):
@@ -577,7 +581,7 @@ class StoryMonitorV2(StoryMonitor):
             self.state.last_check = datetime.now()
 
         new_stories = []
-        target_usernames = {t.username.lower(): t for t in self.targets}
+        target_usernames = self._targets_by_username
         found_targets = set()  # Reels Tray에서 찾은 타겟
 
         try:
@@ -3,6 +3,7 @@ SQLite 데이터베이스 모듈
 
 스토리 다운로드 기록 및 통계 관리
 """
+import queue
 import sqlite3
 import threading
 from pathlib import Path
@@ -57,7 +58,17 @@ class DailyStats:
 
 
 class Database:
-    """SQLite 데이터베이스 관리"""
+    """SQLite 데이터베이스 관리
+
+    쓰기(add_download, add_story_detection, update_daily_stats)는 큐에 넣고
+    단일 writer 스레드가 최대 WRITE_BATCH_SIZE개씩 한 트랜잭션으로 커밋합니다.
+    따라서 조회 결과에는 최대 WRITE_BATCH_INTERVAL초 전까지의 쓰기만 반영될 수 있고,
+    add_download/add_story_detection은 lastrowid 대신 None을 반환합니다.
+    close() 이후의 쓰기는 호출 스레드에서 바로 커밋합니다.
+    """
+
+    WRITE_BATCH_SIZE = 64
+    WRITE_BATCH_INTERVAL = 0.25  # 초
 
     def __init__(self, db_path: str = "data/story_saver.db"):
         self.db_path = Path(db_path)
@@ -66,6 +77,60 @@ class Database:
         self._local = threading.local()
         self._init_db()
 
+        self._write_queue: queue.Queue = queue.Queue()
+        self._closed = False  # True면 writer 스레드 종료, 쓰기는 호출 스레드에서 처리
+        self._submit_lock = threading.Lock()  # _closed 확인과 큐 삽입을 원자적으로
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name="DatabaseWriter",
+            daemon=True
+        )
+        self._writer_thread.start()
+
+    def _submit(self, func, args: tuple):
+        """쓰기 작업을 writer 스레드에 넘기기 (close() 이후면 바로 커밋)"""
+        with self._submit_lock:
+            if not self._closed:
+                self._write_queue.put((func, args))
+                return
+
+        with self._get_cursor() as cursor:
+            func(cursor, *args)
+
+    def _writer_loop(self):
+        """쓰기 큐를 모아 배치 단위로 커밋 (None을 받으면 남은 작업을 커밋하고 종료)"""
+        while True:
+            op = self._write_queue.get()
+            if op is None:
+                break
+
+            batch = [op]
+            stop = False
+            try:
+                while len(batch) < self.WRITE_BATCH_SIZE:
+                    op = self._write_queue.get(timeout=self.WRITE_BATCH_INTERVAL)
+                    if op is None:
+                        stop = True
+                        break
+                    batch.append(op)
+            except queue.Empty:
+                pass
+
+            try:
+                with self._get_cursor() as cursor:
+                    for func, args in batch:
+                        try:
+                            func(cursor, *args)
+                        except sqlite3.Error as e:
+                            logger.error(f"DB 쓰기 실패: {e}")
+            except Exception as e:
+                logger.error(f"DB 배치 커밋 실패 ({len(batch)}건): {e}")
+
+            if stop:
+                break
+
+        self.close()
+
     @property
     def _conn(self) -> sqlite3.Connection:
         """스레드별 연결 가져오기"""
@@ -143,62 +208,65 @@ class Database:
             # 인덱스 생성
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_downloads_username ON downloads(username)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_downloads_date ON downloads(downloaded_at)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_stats_date ON daily_stats(date)')
+            # daily_stats.date는 UNIQUE 제약의 자동 인덱스로 조회되므로 별도 인덱스 불필요
+            cursor.execute('DROP INDEX IF EXISTS idx_daily_stats_date')
 
         logger.debug(f"데이터베이스 초기화 완료: {self.db_path}")
 
-    def add_download(self, record: DownloadRecord) -> int:
-        """다운로드 기록 추가"""
-        with self._get_cursor() as cursor:
-            cursor.execute('''
-                INSERT OR REPLACE INTO downloads
-                (story_id, username, display_name, media_type, file_path, file_size,
-                 downloaded_at, taken_at, cloud_url, status, error_message)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record.story_id,
-                record.username,
-                record.display_name,
-                record.media_type,
-                record.file_path,
-                record.file_size,
-                record.downloaded_at.isoformat() if record.downloaded_at else None,
-                record.taken_at.isoformat() if record.taken_at else None,
-                record.cloud_url,
-                record.status,
-                record.error_message
-            ))
-
-            # 일일 통계 업데이트
-            today = date.today()
-            if record.status == 'completed':
-                self._update_daily_stat(cursor, today, 'downloads_completed', 1)
-                self._update_daily_stat(cursor, today, 'total_size_bytes', record.file_size)
-            else:
-                self._update_daily_stat(cursor, today, 'downloads_failed', 1)
-
-            return cursor.lastrowid
-
-    def add_story_detection(self, story) -> int:
-        """스토리 감지 기록 추가"""
-        with self._get_cursor() as cursor:
-            cursor.execute('''
-                INSERT OR IGNORE INTO story_detections
-                (story_id, username, display_name, media_type, taken_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                story.story_id,
-                story.username,
-                story.display_name,
-                'video' if story.is_video else 'image',
-                story.taken_at.isoformat() if story.taken_at else None
-            ))
-
-            # 일일 통계 업데이트
-            if cursor.rowcount > 0:
-                self._update_daily_stat(cursor, date.today(), 'stories_detected', 1)
-
-            return cursor.lastrowid
+    def add_download(self, record: DownloadRecord):
+        """다운로드 기록 추가 (writer 스레드에서 비동기 저장, 반환값 없음)"""
+        self._submit(self._write_download, (record,))
+
+    def _write_download(self, cursor, record: DownloadRecord):
+        """다운로드 기록 INSERT"""
+        cursor.execute('''
+            INSERT OR REPLACE INTO downloads
+            (story_id, username, display_name, media_type, file_path, file_size,
+             downloaded_at, taken_at, cloud_url, status, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            record.story_id,
+            record.username,
+            record.display_name,
+            record.media_type,
+            record.file_path,
+            record.file_size,
+            record.downloaded_at.isoformat() if record.downloaded_at else None,
+            record.taken_at.isoformat() if record.taken_at else None,
+            record.cloud_url,
+            record.status,
+            record.error_message
+        ))
+
+        # 일일 통계 업데이트 (기록 시각 기준, 배치 지연으로 날짜가 밀리지 않도록)
+        today = record.downloaded_at.date() if record.downloaded_at else date.today()
+        if record.status == 'completed':
+            self._update_daily_stat(cursor, today, 'downloads_completed', 1)
+            self._update_daily_stat(cursor, today, 'total_size_bytes', record.file_size)
+        else:
+            self._update_daily_stat(cursor, today, 'downloads_failed', 1)
+
+    def add_story_detection(self, story):
+        """스토리 감지 기록 추가 (writer 스레드에서 비동기 저장, 반환값 없음)"""
+        self._submit(self._write_story_detection, (story,))
+
+    def _write_story_detection(self, cursor, story):
+        """스토리 감지 기록 INSERT"""
+        cursor.execute('''
+            INSERT OR IGNORE INTO story_detections
+            (story_id, username, display_name, media_type, taken_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            story.story_id,
+            story.username,
+            story.display_name,
+            'video' if story.is_video else 'image',
+            story.taken_at.isoformat() if story.taken_at else None
+        ))
+
+        # 일일 통계 업데이트
+        if cursor.rowcount > 0:
+            self._update_daily_stat(cursor, date.today(), 'stories_detected', 1)
 
     # 허용된 통계 필드 (SQL 인젝션 방지)
     _ALLOWED_STAT_FIELDS = frozenset([
@@ -229,27 +297,41 @@ class Database:
         size_bytes: int = 0,
         stat_date: date = None
     ):
-        """일일 통계 업데이트"""
+        """일일 통계 업데이트 (writer 스레드에서 비동기 저장)"""
         if stat_date is None:
             stat_date = date.today()
 
-        with self._get_cursor() as cursor:
-            cursor.execute('''
-                INSERT INTO daily_stats
-                (date, total_checks, stories_detected, downloads_completed, downloads_failed, total_size_bytes)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date) DO UPDATE SET
-                    total_checks = total_checks + ?,
-                    stories_detected = stories_detected + ?,
-                    downloads_completed = downloads_completed + ?,
-                    downloads_failed = downloads_failed + ?,
-                    total_size_bytes = total_size_bytes + ?,
-                    updated_at = CURRENT_TIMESTAMP
-            ''', (
-                stat_date.isoformat(),
-                checks, stories_detected, downloads_completed, downloads_failed, size_bytes,
-                checks, stories_detected, downloads_completed, downloads_failed, size_bytes
-            ))
+        self._submit(self._write_daily_stats, (
+            stat_date, checks, stories_detected, downloads_completed, downloads_failed, size_bytes
+        ))
+
+    def _write_daily_stats(
+        self,
+        cursor,
+        stat_date: date,
+        checks: int,
+        stories_detected: int,
+        downloads_completed: int,
+        downloads_failed: int,
+        size_bytes: int
+    ):
+        """일일 통계 UPSERT"""
+        cursor.execute('''
+            INSERT INTO daily_stats
+            (date, total_checks, stories_detected, downloads_completed, downloads_failed, total_size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                total_checks = total_checks + ?,
+                stories_detected = stories_detected + ?,
+                downloads_completed = downloads_completed + ?,
+                downloads_failed = downloads_failed + ?,
+                total_size_bytes = total_size_bytes + ?,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (
+            stat_date.isoformat(),
+            checks, stories_detected, downloads_completed, downloads_failed, size_bytes,
+            checks, stories_detected, downloads_completed, downloads_failed, size_bytes
+        ))
 
     def get_daily_stats(self, stat_date: date = None) -> Optional[DailyStats]:
         """일일 통계 조회"""
@@ -381,7 +463,16 @@ class Database:
                 logger.info(f"오래된 감지 기록 {deleted}개 삭제")
 
     def close(self):
-        """연결 종료"""
+        """대기 중인 쓰기를 모두 저장한 뒤 연결 종료 (이후 쓰기는 호출 스레드에서 커밋)"""
+        if threading.current_thread() is not self._writer_thread:
+            with self._submit_lock:
+                already_closed = self._closed
+                self._closed = True
+                if not already_closed:
+                    self._write_queue.put(None)
+            if self._writer_thread.is_alive():
+                self._writer_thread.join(timeout=10)
+
         if hasattr(self._local, 'conn') and self._local.conn:
             self._local.conn.close()
             self._local.conn = None
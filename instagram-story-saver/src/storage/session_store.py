@@ -0,0 +1,74 @@
+"""
+Instagram 세션 저장소
+
+REDIS_URL이 설정되어 있으면 Redis에 세션을 저장하여 여러 API 워커가 같은 세션을 공유하고,
+Redis가 없거나 연결할 수 없으면 로컬 세션 파일을 사용합니다.
+"""
+import os
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+from src.utils.logger import get_logger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = get_logger()
+
+
+class SessionStore:
+    """세션 설정 dict 저장/로드 (Redis 우선, 파일 폴백)"""
+
+    REDIS_KEY = "ig:session"
+    REDIS_TTL = 7 * 24 * 60 * 60  # 7일
+
+    def __init__(self, session_file: str, redis_url: str = ""):
+        self.session_file = Path(session_file)
+        self._redis = None
+
+        if redis_url:
+            if redis is None:
+                logger.warning("redis 패키지가 없어 세션 파일만 사용합니다")
+            else:
+                self._redis = redis.Redis.from_url(
+                    redis_url,
+                    socket_timeout=2,
+                    socket_connect_timeout=2
+                )
+
+    def get(self) -> Optional[dict]:
+        """저장된 세션 설정 반환 (없으면 None)"""
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self.REDIS_KEY)
+                if raw:
+                    return orjson.loads(raw)
+            except redis.RedisError as e:
+                logger.warning(f"Redis 세션 조회 실패, 파일 사용: {e}")
+
+        if not self.session_file.exists():
+            return None
+        return orjson.loads(self.session_file.read_bytes())
+
+    def put(self, settings: dict) -> None:
+        """세션 설정 저장 (파일은 Redis 장애 시 복구용으로 항상 갱신)"""
+        payload = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+
+        self.session_file.parent.mkdir(parents=True, exist_ok=True)
+        self.session_file.write_bytes(payload)
+
+        # 소유자만 읽기/쓰기 가능하도록 권한 설정
+        try:
+            os.chmod(self.session_file, 0o600)
+        except OSError:
+            pass
+
+        if self._redis is not None:
+            try:
+                self._redis.set(self.REDIS_KEY, payload, ex=self.REDIS_TTL)
+            except redis.RedisError as e:
+                logger.warning(f"Redis 세션 저장 실패: {e}")
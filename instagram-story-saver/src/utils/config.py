@@ -91,7 +91,7 @@ class Config:
     batch_size: int = 20
     batch_delay: int = 5
     targets_file: str = "config/targets.json"
-    history_file: str = "data/download_history.json"
+    history_file: str = "data/download_history.db"
     story_expire_hours: int = 24  # 스토리 만료 시간
     
     # Downloader
@@ -106,10 +106,9 @@ class Config:
     image_quality: str = "highest"  # highest, lowest
     download_timeout_connect: int = 10  # 연결 타임아웃 (초)
     download_timeout_read: int = 60  # 읽기 타임아웃 (초)
-    download_chunk_size: int = 8192  # 다운로드 청크 크기 (바이트)
+    download_chunk_size: int = 1048576  # 다운로드 청크 크기 (바이트, 1MB)
     download_max_retries: int = 3  # 다운로드 재시도 횟수
     download_disk_check_interval_mb: int = 10  # 디스크 체크 간격 (MB)
-    download_queue_check_interval: float = 1.0  # 대기열 체크 간격 (초)
     max_completed_history: int = 1000  # 완료 기록 최대 보관 수
     download_user_agent: str = ""  # 다운로드 요청 User-Agent (빈 값이면 기본값 사용)
 
@@ -195,6 +194,17 @@ class Config:
         if self.max_concurrent < 1 or self.max_concurrent > 10:
             errors.append("max_concurrent는 1-10 사이여야 합니다")
         
+        # 다운로드 기록은 SQLite 파일 (.json은 이전 버전 형식이므로 같은 이름의 .db 사용)
+        history_path = Path(self.history_file)
+        if history_path.suffix == '.json':
+            db_path = str(history_path.with_suffix('.db'))
+            import logging
+            logging.getLogger("story_saver").warning(
+                f"monitor.history_file의 .json 형식은 더 이상 사용되지 않습니다. "
+                f"{db_path}를 사용합니다 (기존 기록은 자동으로 가져옴)"
+            )
+            self.history_file = db_path
+        
         # 로그 레벨 검증
         valid_levels = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
         if self.log_level.upper() not in valid_levels:
@@ -315,7 +325,7 @@ def load_config(config_path: str = "config/settings.yaml") -> Config:
         batch_size=data.get('monitor', {}).get('batch_size', 20),
         batch_delay=data.get('monitor', {}).get('batch_delay', 5),
         targets_file=data.get('monitor', {}).get('targets_file', 'config/targets.json'),
-        history_file=data.get('monitor', {}).get('history_file', 'data/download_history.json'),
+        history_file=data.get('monitor', {}).get('history_file', 'data/download_history.db'),
         story_expire_hours=data.get('monitor', {}).get('story_expire_hours', 24),
         
         # Downloader
@@ -330,10 +340,9 @@ def load_config(config_path: str = "config/settings.yaml") -> Config:
         image_quality=data.get('downloader', {}).get('image_quality', 'highest'),
         download_timeout_connect=data.get('downloader', {}).get('timeout_connect', 10),
         download_timeout_read=data.get('downloader', {}).get('timeout_read', 60),
-        download_chunk_size=data.get('downloader', {}).get('chunk_size', 8192),
+        download_chunk_size=data.get('downloader', {}).get('chunk_size', 1048576),
         download_max_retries=data.get('downloader', {}).get('max_retries', 3),
         download_disk_check_interval_mb=data.get('downloader', {}).get('disk_check_interval_mb', 10),
-        download_queue_check_interval=data.get('downloader', {}).get('queue_check_interval', 1.0),
         max_completed_history=data.get('downloader', {}).get('max_completed_history', 1000),
         download_user_agent=data.get('downloader', {}).get('user_agent', ''),
 
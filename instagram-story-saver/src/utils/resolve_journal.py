@@ -0,0 +1,66 @@
+"""
+user_id 조회 저널
+
+resolve_user_ids*.py 스크립트가 조회한 username -> user_id를 한 줄씩 기록합니다.
+targets.json은 조회가 끝난 뒤 한 번만 저장하고, 중간에 중단되면
+다음 실행 시 저널을 먼저 targets에 반영하여 이어서 진행합니다.
+"""
+import os
+from pathlib import Path
+
+import orjson
+
+
+def journal_path_for(targets_path: Path) -> Path:
+    """targets 파일에 대응하는 저널 경로 (예: targets.json -> targets.resolved.jsonl)"""
+    return targets_path.with_name(targets_path.stem + '.resolved.jsonl')
+
+
+def set_user_id(targets: list, i: int, uname: str, user_id) -> None:
+    """targets[i]에 user_id 반영 (문자열 항목은 dict로 변환)"""
+    target = targets[i]
+    if isinstance(target, dict):
+        target['user_id'] = user_id
+    else:
+        targets[i] = {'username': uname, 'user_id': user_id}
+
+
+def replay_journal(journal_path: Path, targets: list, idx_by_name: dict) -> int:
+    """저널의 조회 결과를 targets에 반영하고 반영한 수 반환"""
+    if not journal_path.exists():
+        return 0
+
+    recovered = 0
+    with open(journal_path, 'rb') as f:
+        for line in f:
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # 중단 시 잘린 마지막 줄
+            i = idx_by_name.get(entry.get('username'))
+            if i is not None:
+                set_user_id(targets, i, entry['username'], entry['user_id'])
+                recovered += 1
+    return recovered
+
+
+class ResolveJournal:
+    """조회 결과를 append하고 줄마다 fsync (기존 내용은 절대 지우지 않음)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'ab')
+
+    def record(self, uname: str, user_id) -> None:
+        self._file.write(orjson.dumps({'username': uname, 'user_id': user_id}) + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
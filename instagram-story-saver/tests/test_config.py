@@ -0,0 +1,43 @@
+"""
+설정 로드 테스트
+"""
+import sys
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.config import load_config
+
+
+def _write_settings(tmp_path: Path, history_file: str) -> Path:
+    settings = tmp_path / "settings.yaml"
+    settings.write_text(
+        "instagram:\n"
+        "  username: tester\n"
+        "  password: secret\n"
+        "monitor:\n"
+        f"  targets_file: {tmp_path / 'targets.json'}\n"
+        f"  history_file: {history_file}\n",
+        encoding="utf-8"
+    )
+    return settings
+
+
+def test_legacy_json_history_file_maps_to_db(tmp_path, caplog):
+    """이전 예시 설정의 .json history_file은 오류 없이 .db로 대체"""
+    settings = _write_settings(tmp_path, "data/download_history.json")
+
+    with caplog.at_level(logging.WARNING, logger="story_saver"):
+        config = load_config(str(settings))
+
+    assert config.history_file == str(Path("data/download_history.db"))
+    assert "history_file" in caplog.text
+
+
+def test_db_history_file_is_kept(tmp_path):
+    settings = _write_settings(tmp_path, "data/custom_history.db")
+
+    config = load_config(str(settings))
+
+    assert config.history_file == "data/custom_history.db"